@@ -5,6 +5,7 @@ from .conf import settings as rosetta_settings
 
 class RosettaAppConfig(AppConfig):
     name = "rosetta"
+    default_auto_field = "django.db.models.AutoField"
 
     def ready(self):
         from django.contrib import admin
@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.core.cache import caches, close_caches
+from django.utils import timezone
+from django.utils.connection import ConnectionProxy
+
+from .conf import settings as rosetta_settings
+from .pocache import catalog_lock, po_file_cache
+
+
+logger = logging.getLogger("rosetta.compiler")
+
+# Looks up the cache of the current thread on each use: Django gives each thread
+# its own cache clients, as the clients of some backends (pymemcache's, for
+# instance) can't be shared by threads
+cache = ConnectionProxy(caches, rosetta_settings.ROSETTA_CACHE_NAME)
+
+QUEUED, RUNNING, COMPILED, FAILED = "queued", "running", "compiled", "failed"
+
+
+def mo_path(po_path):
+    return os.path.splitext(po_path)[0] + ".mo"
+
+
+def _status_cache_key(po_path):
+    return "rosetta-compile-status-%s" % hashlib.md5(po_path.encode("utf8")).hexdigest()
+
+
+def compile_status(po_path):
+    """
+    Return the status of the last compilation of the catalog at ``po_path`` in
+    the background or by the ``rosetta_compile`` command, as a dictionary with
+    the keys "status" (one of "queued", "running", "compiled" or "failed"),
+    "updated" (the time of the last change of status), "last_compiled" (the
+    time of the last successful compilation, if any) and "error". Returns
+    ``None`` if the catalog was never compiled that way.
+    """
+    return cache.get(_status_cache_key(po_path))
+
+
+def _set_status(po_path, status, error=None):
+    key = _status_cache_key(po_path)
+    now = timezone.now()
+    previous = cache.get(key) or {}
+    cache.set(
+        key,
+        {
+            "status": status,
+            "updated": now,
+            "last_compiled": now
+            if status == COMPILED
+            else previous.get("last_compiled"),
+            "error": error,
+        },
+        86400,
+    )
+
+
+def compile_catalog(po_path):
+    """
+    Compile the catalog at ``po_path`` to the .mo file next to it, keeping track
+    of the status of the compilation. Returns whether it succeeded.
+    """
+    try:
+        _set_status(po_path, RUNNING)
+        # Don't compile the shared catalog while it's being changed
+        with catalog_lock(po_path):
+            po_file = po_file_cache.get(po_path, rosetta_settings.POFILE_WRAP_WIDTH)
+            po_file.save_as_mofile(mo_path(po_path))
+    except Exception as e:
+        _set_status(po_path, FAILED, error=str(e))
+        return False
+    _set_status(po_path, COMPILED)
+    return True
+
+
+class CompileWorker(object):
+    """
+    Compiles catalogs to .mo files in a pool of background threads.
+
+    Compilations of a catalog that are scheduled while a previous one is still
+    queued are coalesced into it: the catalog is read from disk when its
+    compilation starts, so it includes all the changes saved until then.
+    """
+
+    max_workers = 2
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._executor = None
+        self._queued = {}
+        self._path_locks = {}
+        self._futures = set()
+
+    def schedule(self, po_path, on_compiled=None):
+        """
+        Compile the catalog at ``po_path`` in the background, then call
+        ``on_compiled`` (if given, and if the compilation succeeded). Returns
+        ``False`` if the compilation was coalesced into one that was already
+        queued, in which case only the last ``on_compiled`` is called.
+        """
+        with self._lock:
+            queued = po_path in self._queued
+            self._queued[po_path] = on_compiled
+            if queued:
+                return False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="rosetta-compile"
+                )
+            path_lock = self._path_locks.setdefault(po_path, threading.Lock())
+            _set_status(po_path, QUEUED)
+            future = self._executor.submit(self._compile, po_path, path_lock)
+            self._futures.add(future)
+            future.add_done_callback(self._forget)
+        return True
+
+    def _forget(self, future):
+        with self._lock:
+            self._futures.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(
+                "Background compilation failed",
+                exc_info=future.exception(),
+            )
+
+    def _compile(self, po_path, path_lock):
+        try:
+            # Compilations of the same catalog don't overlap
+            with path_lock:
+                with self._lock:
+                    on_compiled = self._queued.pop(po_path)
+                if compile_catalog(po_path) and on_compiled is not None:
+                    on_compiled()
+        finally:
+            # Close the cache clients this thread opened, as Django does at the
+            # end of each request
+            close_caches()
+
+    def wait(self, timeout=None):
+        """
+        Wait for the compilations scheduled so far to be done.
+        """
+        with self._lock:
+            futures = list(self._futures)
+        wait(futures, timeout=timeout)
+
+
+# The compile worker of this process
+compile_worker = CompileWorker()
@@ -43,12 +43,20 @@ class RosettaSettings(object):
         "ROSETTA_ACCESS_CONTROL_FUNCTION": ("ACCESS_CONTROL_FUNCTION", None),
         "ROSETTA_WSGI_AUTO_RELOAD": ("WSGI_AUTO_RELOAD", False),
         "ROSETTA_UWSGI_AUTO_RELOAD": ("UWSGI_AUTO_RELOAD", False),
+        "ROSETTA_GETTEXT_AUTO_RELOAD": ("GETTEXT_AUTO_RELOAD", False),
         "ROSETTA_EXCLUDED_APPLICATIONS": ("EXCLUDED_APPLICATIONS", ()),
         "ROSETTA_POFILE_WRAP_WIDTH": ("POFILE_WRAP_WIDTH", 78),
+        "ROSETTA_POFILE_CACHE_MAX_ENTRIES": ("POFILE_CACHE_MAX_ENTRIES", 16),
+        "ROSETTA_POFILE_CACHE_MAX_BYTES": (
+            "POFILE_CACHE_MAX_BYTES",
+            64 * 1024 * 1024,
+        ),
+        "ROSETTA_SHARED_CATALOG_CACHE": ("SHARED_CATALOG_CACHE", True),
         "ROSETTA_STORAGE_CLASS": (
             "STORAGE_CLASS",
             "rosetta.storage.CacheRosettaStorage",
         ),
+        "ROSETTA_STORAGE_DIR": ("STORAGE_DIR", None),
         "ROSETTA_ENABLE_REFLANG": ("ENABLE_REFLANG", False),
         "ROSETTA_POFILENAMES": ("POFILENAMES", ("django.po", "djangojs.po")),
         "ROSETTA_CACHE_NAME": (
@@ -59,6 +67,8 @@ class RosettaSettings(object):
         "ROSETTA_EXCLUDED_PATHS": ("ROSETTA_EXCLUDED_PATHS", ()),
         "ROSETTA_LANGUAGE_GROUPS": ("ROSETTA_LANGUAGE_GROUPS", False),
         "ROSETTA_AUTO_COMPILE": ("AUTO_COMPILE", True),
+        "ROSETTA_AUTO_COMPILE_IN_BACKGROUND": ("AUTO_COMPILE_IN_BACKGROUND", False),
+        "ROSETTA_SERVER_TIMING": ("SERVER_TIMING", False),
         "ROSETTA_SHOW_AT_ADMIN_PANEL": ("SHOW_AT_ADMIN_PANEL", False),
         "ROSETTA_LOGIN_URL": ("LOGIN_URL", dj_settings.LOGIN_URL),
         "ROSETTA_LANGUAGES": ("ROSETTA_LANGUAGES", dj_settings.LANGUAGES),
@@ -0,0 +1,100 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+
+from .conf import settings as rosetta_settings
+from .pocache import po_file_cache
+from .reload import reload_language
+from .signals import catalog_invalidated
+
+
+# Looks up the cache of the current thread on each use: the clients of some
+# backends can't be shared by threads (see ``rosetta.compiler``)
+cache = ConnectionProxy(caches, rosetta_settings.ROSETTA_CACHE_NAME)
+
+VERSION_CACHE_KEY = "rosetta-catalogs-version"
+CHANGE_TIMEOUT = 86400
+# Past this number of changes to catch up with, everything is invalidated
+MAX_CHANGES = 100
+
+# Identifies this process in the changes it publishes
+_origin = uuid.uuid4().hex
+# The last global version this process caught up with
+_seen_version = None
+
+
+def _change_cache_key(version):
+    return "rosetta-catalog-change-%d" % version
+
+
+def _incr(key):
+    cache.add(key, 0, None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # The key was evicted in between
+        cache.add(key, 1, None)
+        return 1
+
+
+def catalog_changed(po_path, language_code):
+    """
+    Tell all the processes sharing the Rosetta cache that the catalog at
+    ``po_path`` changed. They drop their state about it on their next call to
+    ``check_invalidations()``.
+    """
+    version = _incr(VERSION_CACHE_KEY)
+    cache.set(
+        _change_cache_key(version), (po_path, language_code, _origin), CHANGE_TIMEOUT
+    )
+
+
+def invalidate_catalog(po_path, language_code):
+    """
+    Drop the state this process keeps about the catalog at ``po_path``, and
+    send the ``catalog_invalidated`` signal. This can also be called by other
+    notification mechanisms.
+    """
+    po_file_cache.discard(po_path)
+    if rosetta_settings.GETTEXT_AUTO_RELOAD:
+        reload_language(language_code)
+    catalog_invalidated.send(sender=None, po_path=po_path, language_code=language_code)
+
+
+def invalidate_all():
+    """
+    Drop all the state this process keeps about catalogs. The translations of
+    the default language being the fallback of all the others, all of them are
+    reloaded.
+    """
+    po_file_cache.clear()
+    if rosetta_settings.GETTEXT_AUTO_RELOAD:
+        reload_language(settings.LANGUAGE_CODE)
+    catalog_invalidated.send(sender=None, po_path=None, language_code=None)
+
+
+def check_invalidations():
+    """
+    Apply the changes published by the other processes since the last call.
+    This costs a single cache lookup when nothing changed.
+    """
+    global _seen_version
+    version = cache.get(VERSION_CACHE_KEY, 0)
+    seen_version, _seen_version = _seen_version, version
+    if seen_version is None or version == seen_version:
+        # Nothing to catch up with when starting up
+        return
+    if not 0 < version - seen_version <= MAX_CHANGES:
+        invalidate_all()
+        return
+    keys = [_change_cache_key(v) for v in range(seen_version + 1, version + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) < len(keys):
+        invalidate_all()
+        return
+    for key in keys:
+        po_path, language_code, origin = changes[key]
+        if origin != _origin:
+            invalidate_catalog(po_path, language_code)
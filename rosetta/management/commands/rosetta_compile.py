@@ -0,0 +1,61 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...compiler import compile_catalog, mo_path
+from ...conf import settings as rosetta_settings
+from ...poutil import find_pos_many
+
+
+class Command(BaseCommand):
+    help = (
+        "Compiles the catalogs that Rosetta can edit whose .mo file is missing or "
+        "older than the .po file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Compile all the catalogs, even if their .mo file is up to date.",
+        )
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="Keep running, compiling the catalogs as they are saved.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Number of seconds between two checks with --watch (default: 2).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.compile_catalogs(compile_all=options["all"])
+            if not options["watch"]:
+                break
+            time.sleep(options["interval"])
+
+    def compile_catalogs(self, compile_all=False):
+        langs = [lang for lang, name in rosetta_settings.ROSETTA_LANGUAGES]
+        po_paths = find_pos_many(
+            langs, project_apps=True, django_apps=True, third_party_apps=True
+        )
+        for path in sorted({path for paths in po_paths.values() for path in paths}):
+            if not (compile_all or self.is_stale(path)):
+                continue
+            if not os.access(os.path.dirname(path), os.W_OK):
+                continue
+            if compile_catalog(path):
+                self.stdout.write("Compiled %s" % path)
+            else:
+                self.stderr.write("Failed to compile %s" % path)
+
+    def is_stale(self, path):
+        try:
+            return os.stat(mo_path(path)).st_mtime_ns < os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return True
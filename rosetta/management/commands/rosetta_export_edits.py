@@ -0,0 +1,72 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from ... import get_version as get_rosetta_version
+from ...compiler import mo_path
+from ...conf import settings as rosetta_settings
+from ...models import EntryEdit
+from ...pocache import load_pofile, overlay_pofile
+from ...poutil import timestamp_with_timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes the translations edited with the DatabaseRosettaStorage to their "
+        "catalogs, and compiles them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Delete the edits from the database once they are exported.",
+        )
+        parser.add_argument(
+            "--no-compile",
+            action="store_false",
+            dest="compile",
+            help="Don't compile the catalogs to .mo files.",
+        )
+
+    def handle(self, *args, **options):
+        catalogs = (
+            EntryEdit.objects.values_list("po_path", "language_code")
+            .order_by("po_path", "language_code")
+            .distinct()
+        )
+        for po_path, language_code in catalogs:
+            self.export_catalog(po_path, language_code, **options)
+
+    def export_catalog(self, po_path, language_code, **options):
+        edits = EntryEdit.objects.filter(po_path=po_path, language_code=language_code)
+        # The versions of the edits being exported, so that the ones changed in
+        # the meantime aren't deleted
+        versions = list(edits.values_list("pk", "version"))
+        overlay = edits.overlay()
+        if not os.path.exists(po_path):
+            self.stderr.write("Skipped %s: the file doesn't exist" % po_path)
+            return
+
+        po_file = overlay_pofile(
+            load_pofile(po_path, wrapwidth=rosetta_settings.POFILE_WRAP_WIDTH), overlay
+        )
+        po_file.metadata["X-Translated-Using"] = "django-rosetta %s" % (
+            get_rosetta_version()
+        )
+        po_file.metadata["PO-Revision-Date"] = timestamp_with_timezone()
+        try:
+            po_file.save(po_path)
+            if options["compile"]:
+                po_file.save_as_mofile(mo_path(po_path))
+        except OSError as e:
+            self.stderr.write("Failed to export %s: %s" % (po_path, e))
+            return
+        self.stdout.write("Exported %d edits to %s" % (len(overlay), po_path))
+
+        if options["delete"] and versions:
+            query = Q()
+            for pk, version in versions:
+                query |= Q(pk=pk, version=version)
+            edits.filter(query).delete()
@@ -0,0 +1,16 @@
+from .invalidation import check_invalidations
+
+
+class CatalogInvalidationMiddleware(object):
+    """
+    Drops the state this process keeps about the catalogs that were saved by
+    Rosetta in other processes (parsed catalogs and, with
+    ``ROSETTA_GETTEXT_AUTO_RELOAD``, translations) before handling a request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        check_invalidations()
+        return self.get_response(request)
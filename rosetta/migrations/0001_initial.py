@@ -0,0 +1,75 @@
+# Generated by Django 5.0.14 on 2026-10-18 08:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EntryEdit",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("po_path", models.CharField(max_length=255, verbose_name="catalog")),
+                (
+                    "language_code",
+                    models.CharField(max_length=32, verbose_name="language"),
+                ),
+                (
+                    "entry_key",
+                    models.CharField(max_length=32, verbose_name="entry key"),
+                ),
+                ("msgstr", models.TextField(blank=True, verbose_name="translation")),
+                (
+                    "msgstr_plural",
+                    models.JSONField(default=list, verbose_name="plural translations"),
+                ),
+                ("fuzzy", models.BooleanField(default=False, verbose_name="fuzzy")),
+                (
+                    "version",
+                    models.PositiveIntegerField(default=1, verbose_name="version"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="updated at"),
+                ),
+                (
+                    "updated_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="updated by",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "entry edit",
+                "verbose_name_plural": "entry edits",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="entryedit",
+            constraint=models.UniqueConstraint(
+                fields=("po_path", "language_code", "entry_key"),
+                name="rosetta_entryedit_unique_entry",
+            ),
+        ),
+    ]
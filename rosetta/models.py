@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class EntryEditQuerySet(models.QuerySet):
+    def overlay(self):
+        """
+        Return the edits as an overlay (see ``rosetta.pocache.overlay_pofile``).
+        """
+        return {
+            key: [msgstr, msgstr_plural, fuzzy]
+            for key, msgstr, msgstr_plural, fuzzy in self.values_list(
+                "entry_key", "msgstr", "msgstr_plural", "fuzzy"
+            )
+        }
+
+
+class EntryEdit(models.Model):
+    """
+    The translation of an entry of a catalog, as edited in Rosetta by
+    ``DatabaseRosettaStorage``, until it's exported to the catalog by the
+    ``rosetta_export_edits`` management command.
+    """
+
+    po_path = models.CharField(_("catalog"), max_length=255)
+    language_code = models.CharField(_("language"), max_length=32)
+    entry_key = models.CharField(_("entry key"), max_length=32)
+    msgstr = models.TextField(_("translation"), blank=True)
+    # As a list of [plural_id, msgstr] pairs
+    msgstr_plural = models.JSONField(_("plural translations"), default=list)
+    fuzzy = models.BooleanField(_("fuzzy"), default=False)
+    version = models.PositiveIntegerField(_("version"), default=1)
+    updated_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name=_("updated by"),
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    updated_at = models.DateTimeField(_("updated at"), auto_now=True)
+
+    objects = EntryEditQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("entry edit")
+        verbose_name_plural = _("entry edits")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["po_path", "language_code", "entry_key"],
+                name="rosetta_entryedit_unique_entry",
+            )
+        ]
+
+    def __str__(self):
+        return "%s (%s): %s" % (self.po_path, self.language_code, self.entry_key)
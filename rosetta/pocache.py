@@ -0,0 +1,926 @@
+import bisect
+import hashlib
+import os
+import pickle
+import stat
+import tempfile
+import threading
+import uuid
+import weakref
+import zlib
+from array import array
+from collections import ChainMap, OrderedDict
+
+from polib import POEntry, POFile, pofile
+
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+
+from .conf import settings as rosetta_settings
+from .poutil import POScanner
+from .timing import timed
+
+
+# Looks up the cache of the current thread on each use: the clients of some
+# backends can't be shared by threads (see ``rosetta.compiler``)
+cache = ConnectionProxy(caches, rosetta_settings.ROSETTA_CACHE_NAME)
+
+
+def entry_key(entry):
+    """
+    Return the key identifying ``entry`` in its catalog.
+
+    The key only depends on the entry's msgid and context, which together
+    identify an entry in a catalog, so that it doesn't change when the entry is
+    translated: it's the MD5 digest of the msgid, preceded by the context and
+    "\\x04" (as in .mo files) if the entry has one. It is computed on first use
+    and kept on the entry, in an attribute called "md5hash".
+    """
+    key = getattr(entry, "md5hash", None)
+    if key is None:
+        str_to_hash = str(entry.msgid)
+        if entry.msgctxt:
+            str_to_hash = str(entry.msgctxt) + "\x04" + str_to_hash
+        str_to_hash = str_to_hash.encode("utf8")
+        key = entry.md5hash = hashlib.md5(str_to_hash).hexdigest()
+    return key
+
+
+def entry_version(entry):
+    """
+    Return a token that changes whenever the translation of ``entry``, or its
+    fuzzy flag, changes. Used to detect concurrent edits.
+    """
+    parts = [entry.msgstr]
+    parts += [entry.msgstr_plural[k] for k in sorted(entry.msgstr_plural)]
+    parts.append("fuzzy" if entry.fuzzy else "")
+    return hashlib.md5("\x00".join(parts).encode("utf8")).hexdigest()[:12]
+
+
+@timed("index")
+def index_entries(po_file):
+    """
+    Build the index of the (non obsolete) entries of ``po_file`` by key, and
+    keep it on the catalog, so that it is cached and stored along with it.
+    """
+    po_file.md5hash_index = index = {}
+    for entry in po_file:
+        if not entry.obsolete:
+            index.setdefault(entry_key(entry), entry)
+    return index
+
+
+def find_entry(po_file, md5hash):
+    """
+    Return the (non obsolete) entry of ``po_file`` with the given key, or
+    ``None``. Unlike ``POFile.find``, this doesn't scan the whole catalog.
+    """
+    index = getattr(po_file, "md5hash_index", None)
+    if index is None:
+        index = index_entries(po_file)
+    return index.get(md5hash)
+
+
+# Lookup structures derived from parsed catalogs, by catalog id. They live as
+# long as the catalogs themselves (e.g. in the process cache), but aren't
+# pickled along with them when they are stored.
+_derived = {}
+
+
+def _derived_data(po_file):
+    data = _derived.get(id(po_file))
+    if data is None:
+        data = _derived[id(po_file)] = {}
+        weakref.finalize(po_file, _derived.pop, id(po_file), None)
+    return data
+
+
+def _search_text(entry):
+    return "\x00".join(
+        [
+            entry.msgstr,
+            entry.msgid,
+            entry.msgctxt or "",
+            entry.comment or "",
+            "".join(o[0] for o in entry.occurrences),
+            entry.msgid_plural or "",
+            "".join(entry.msgstr_plural.values()),
+        ]
+    ).casefold()
+
+
+def _trigrams(text):
+    return {a + b + c for a, b, c in zip(text, text[1:], text[2:])}
+
+
+def _entry_positions(po_file):
+    data = _derived_data(po_file)
+    positions = data.get("positions")
+    if positions is None:
+        positions = data["positions"] = {}
+        for position, entry in enumerate(po_file):
+            if not entry.obsolete:
+                positions.setdefault(entry_key(entry), position)
+    return positions
+
+
+class SearchIndex(object):
+    """
+    Case-folded trigram index over the searchable fields of the (non obsolete)
+    entries of a catalog: msgstr, msgid, msgctxt, comment, occurrences and
+    plural forms.
+
+    Candidate entries are narrowed down with the trigrams of the query, and
+    confirmed against their case-folded text, so that the cost of a search
+    depends on the number of candidates rather than on the catalog's size.
+    """
+
+    def __init__(self, po_file):
+        self.positions = _entry_positions(po_file)
+        self.texts = []
+        self.trigrams = {}
+        for position, entry in enumerate(po_file):
+            if entry.obsolete:
+                self.texts.append(None)
+                continue
+            text = _search_text(entry)
+            self.texts.append(text)
+            for trigram in _trigrams(text):
+                self.trigrams.setdefault(trigram, array("I")).append(position)
+
+    def search(self, query):
+        """
+        Return the sorted positions of the entries matching ``query``.
+        """
+        query = query.casefold()
+        trigrams = _trigrams(query)
+        if not trigrams:
+            candidates = range(len(self.texts))
+        else:
+            postings = []
+            for trigram in trigrams:
+                posting = self.trigrams.get(trigram)
+                if not posting:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = postings[0]
+            for posting in postings[1:]:
+                candidates = [p for p in candidates if _contains(posting, p)]
+        return [p for p in candidates if self.texts[p] and query in self.texts[p]]
+
+    def update(self, entry):
+        """
+        Update the index after the given entry was changed.
+        """
+        position = self.positions[entry_key(entry)]
+        old_text = self.texts[position]
+        text = None if entry.obsolete else _search_text(entry)
+        if text == old_text:
+            return
+        old_trigrams = _trigrams(old_text) if old_text else set()
+        new_trigrams = _trigrams(text) if text else set()
+        for trigram in old_trigrams - new_trigrams:
+            posting = self.trigrams[trigram]
+            del posting[bisect.bisect_left(posting, position)]
+        for trigram in new_trigrams - old_trigrams:
+            posting = self.trigrams.setdefault(trigram, array("I"))
+            posting.insert(bisect.bisect_left(posting, position), position)
+        self.texts[position] = text
+
+
+class OverlaySearchIndex(object):
+    """
+    The search index of a catalog returned by ``overlay_pofile``: the index of
+    the base catalog (shared by all the copies), patched with the texts of the
+    entries of the copy that differ from the base.
+    """
+
+    def __init__(self, base_index, entries):
+        self.base_index = base_index
+        self.positions = base_index.positions
+        self.texts = {}
+        for entry in entries:
+            self.update(entry)
+
+    def search(self, query):
+        """
+        Return the sorted positions of the entries matching ``query``.
+        """
+        positions = [p for p in self.base_index.search(query) if p not in self.texts]
+        query = query.casefold()
+        positions.extend(p for p, text in self.texts.items() if text and query in text)
+        return sorted(positions)
+
+    def update(self, entry):
+        """
+        Update the index after the given entry was changed.
+        """
+        position = self.positions[entry_key(entry)]
+        self.texts[position] = None if entry.obsolete else _search_text(entry)
+
+
+def _contains(posting, position):
+    i = bisect.bisect_left(posting, position)
+    return i < len(posting) and posting[i] == position
+
+
+# Entry states, as tracked by FilterPartitions
+OBSOLETE, UNTRANSLATED, TRANSLATED, FUZZY = range(4)
+
+
+def _entry_state(entry):
+    if entry.obsolete:
+        return OBSOLETE
+    elif entry.fuzzy:
+        return FUZZY
+    elif entry.translated():
+        return TRANSLATED
+    return UNTRANSLATED
+
+
+class FilterPartitions(object):
+    """
+    The positions of the entries of a catalog shown by each of the message
+    filters of the translation form ('untranslated', 'translated', 'fuzzy' and
+    'all'), as compact sorted arrays.
+    """
+
+    def __init__(self, po_file):
+        self.positions = _entry_positions(po_file)
+        self.states = array("b")
+        self.partitions = {
+            "untranslated": array("I"),
+            "translated": array("I"),
+            "fuzzy": array("I"),
+            "all": array("I"),
+        }
+        for position, entry in enumerate(po_file):
+            state = _entry_state(entry)
+            self.states.append(state)
+            for msg_filter in self._filters(state):
+                self.partitions[msg_filter].append(position)
+
+    def _filters(self, state):
+        if state == OBSOLETE:
+            return ()
+        return (
+            "all",
+            {UNTRANSLATED: "untranslated", TRANSLATED: "translated"}.get(
+                state, "fuzzy"
+            ),
+        )
+
+    def copy(self):
+        copy = type(self).__new__(type(self))
+        copy.positions = self.positions
+        copy.states = array("b", self.states)
+        copy.partitions = {
+            msg_filter: array("I", partition)
+            for msg_filter, partition in self.partitions.items()
+        }
+        return copy
+
+    def get(self, msg_filter):
+        return self.partitions[msg_filter]
+
+    def update(self, entry):
+        """
+        Move the given entry to the right partitions after it was changed.
+        """
+        position = self.positions[entry_key(entry)]
+        old_state, state = self.states[position], _entry_state(entry)
+        if old_state == state:
+            return
+        old_filters, filters = self._filters(old_state), self._filters(state)
+        for msg_filter in set(old_filters) - set(filters):
+            partition = self.partitions[msg_filter]
+            del partition[bisect.bisect_left(partition, position)]
+        for msg_filter in set(filters) - set(old_filters):
+            partition = self.partitions[msg_filter]
+            partition.insert(bisect.bisect_left(partition, position), position)
+        self.states[position] = state
+
+
+def filter_positions(po_file, msg_filter):
+    """
+    Return the sorted array of the positions of the entries of ``po_file`` shown
+    by the given message filter. The partitions are computed on first use and
+    kept for as long as the catalog.
+    """
+    data = _derived_data(po_file)
+    partitions = data.get("partitions")
+    if partitions is None:
+        base = data.get("base")
+        if base is None:
+            partitions = data["partitions"] = FilterPartitions(po_file)
+        else:
+            # Overlaid catalogs start from the partitions of their base
+            base_partitions = _derived_data(base).get("partitions")
+            if base_partitions is None:
+                base_partitions = _derived_data(base)["partitions"] = FilterPartitions(
+                    base
+                )
+            partitions = data["partitions"] = base_partitions.copy()
+            for entry in data["owned"].values():
+                partitions.update(entry)
+    return partitions.get(msg_filter)
+
+
+class EntryList(object):
+    """
+    A read-only sequence of the entries of a catalog at the given positions,
+    suitable for Django's ``Paginator``: its length is known upfront and
+    slicing it only touches the entries of the slice.
+    """
+
+    def __init__(self, po_file, positions):
+        self.po_file = po_file
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.po_file[position] for position in self.positions[index]]
+        return self.po_file[self.positions[index]]
+
+    def __iter__(self):
+        for position in self.positions:
+            yield self.po_file[position]
+
+
+def filtered_entries(po_file, msg_filter):
+    """
+    Return the entries of ``po_file`` shown by the given message filter, as an
+    ``EntryList``.
+    """
+    return EntryList(po_file, filter_positions(po_file, msg_filter))
+
+
+# Number of search results kept per catalog, so that paging through the
+# results of a query doesn't search the catalog again
+SEARCH_RESULTS_CACHE_SIZE = 8
+
+
+def search_entries(po_file, query):
+    """
+    Return the (non obsolete) entries of ``po_file`` matching ``query``, in
+    catalog order, as an ``EntryList``. The search index is built on first use
+    and kept for as long as the catalog.
+    """
+    data = _derived_data(po_file)
+    index = data.get("search")
+    if index is None:
+        base = data.get("base")
+        if base is None:
+            index = data["search"] = SearchIndex(po_file)
+        else:
+            # Overlaid catalogs share the index of their base
+            base_index = _derived_data(base).get("search")
+            if base_index is None:
+                base_index = _derived_data(base)["search"] = SearchIndex(base)
+            index = data["search"] = OverlaySearchIndex(
+                base_index, data["owned"].values()
+            )
+    results = data.setdefault("search_results", OrderedDict())
+    positions = results.get(query)
+    if positions is None:
+        positions = results[query] = array("I", index.search(query))
+        while len(results) > SEARCH_RESULTS_CACHE_SIZE:
+            results.popitem(last=False)
+    else:
+        results.move_to_end(query)
+    return EntryList(po_file, positions)
+
+
+def entries_changed(po_file, entries):
+    """
+    Update the lookup structures derived from ``po_file`` after the given
+    entries were changed.
+    """
+    data = _derived.get(id(po_file), {})
+    data.pop("search_results", None)
+    for name in ("search", "partitions"):
+        index = data.get(name)
+        if index is not None:
+            for entry in entries:
+                index.update(entry)
+
+
+def overlay_item(entry):
+    """
+    Return what an overlay records about ``entry``: its translation(s) and
+    fuzzy flag, as plain values that can be stored in any session or cache.
+    """
+    return [
+        entry.msgstr,
+        [
+            [plural_id, msgstr]
+            for plural_id, msgstr in sorted(entry.msgstr_plural.items())
+        ],
+        entry.fuzzy,
+    ]
+
+
+def _copy_entry(entry):
+    copy = POEntry.__new__(POEntry)
+    copy.__dict__ = dict(entry.__dict__)
+    copy.msgstr_plural = dict(entry.msgstr_plural)
+    copy.flags = list(entry.flags)
+    return copy
+
+
+def overlay_pofile(base, overlay):
+    """
+    Return a copy of the catalog ``base`` with the given overlay applied. An
+    overlay maps the keys of the entries a user changed to their
+    ``overlay_item``; the keys of entries that are no longer in the catalog are
+    ignored.
+
+    Only the overlaid entries are copied, the others are shared with ``base``
+    (which may be shared between users): use ``own_entry`` before changing an
+    entry of the copy. Likewise, the lookup structures of the copy (index, filter
+    partitions and search index) are derived from the ones of ``base``, adjusted
+    for the entries of the copy.
+    """
+    po_file = POFile.__new__(POFile)
+    po_file.__dict__.update(
+        (field, getattr(base, field, None)) for field in POFILE_FIELDS
+    )
+    po_file.metadata = dict(base.metadata)
+    po_file.extend(base)
+    # The index of the base, under the entries of the copy that aren't shared
+    po_file.md5hash_index = ChainMap(
+        {}, getattr(base, "md5hash_index", None) or index_entries(base)
+    )
+    data = _derived_data(po_file)
+    data["base"] = base
+    # The entries that aren't shared with the base, by key
+    data["owned"] = {}
+    # The entries are at the same positions in both catalogs
+    data["positions"] = _entry_positions(base)
+    for key, (msgstr, msgstr_plural, fuzzy) in overlay.items():
+        entry = find_entry(po_file, key)
+        if entry is None:
+            continue
+        entry = own_entry(po_file, entry)
+        entry.msgstr = msgstr
+        entry.msgstr_plural = {plural_id: value for plural_id, value in msgstr_plural}
+        if fuzzy and not entry.fuzzy:
+            entry.flags.append("fuzzy")
+        elif not fuzzy and entry.fuzzy:
+            entry.flags.remove("fuzzy")
+    return po_file
+
+
+def own_entry(po_file, entry):
+    """
+    Return a version of the entry of ``po_file`` that can be changed in place:
+    ``entry`` itself, unless it's shared with the catalog ``po_file`` was
+    overlaid on, in which case it's replaced in ``po_file`` by a copy.
+    """
+    base = _derived_data(po_file).get("base")
+    key = entry_key(entry)
+    if base is None or find_entry(base, key) is not entry:
+        return entry
+    copy = _copy_entry(entry)
+    po_file[_entry_positions(po_file)[key]] = copy
+    po_file.md5hash_index[key] = copy
+    _derived_data(po_file)["owned"][key] = copy
+    return copy
+
+
+def update_overlay(overlay, po_file, entries):
+    """
+    Record the given changed entries of ``po_file`` (as returned by
+    ``overlay_pofile``) in ``overlay``. Entries that were changed back to their
+    translation in the base catalog are dropped from it.
+    """
+    base = _derived_data(po_file)["base"]
+    for entry in entries:
+        key = entry_key(entry)
+        item = overlay_item(entry)
+        if item == overlay_item(find_entry(base, key)):
+            overlay.pop(key, None)
+        else:
+            overlay[key] = item
+    return overlay
+
+
+# The attributes of the catalogs and of their entries, as serialized by
+# dumps_pofile()
+SERIALIZATION_VERSION = 1
+POFILE_FIELDS = (
+    "fpath",
+    "wrapwidth",
+    "encoding",
+    "check_for_duplicates",
+    "header",
+    "metadata",
+    "metadata_is_fuzzy",
+)
+ENTRY_FIELDS = (
+    "msgid",
+    "msgstr",
+    "msgid_plural",
+    "msgstr_plural",
+    "msgctxt",
+    "obsolete",
+    "encoding",
+    "comment",
+    "tcomment",
+    "occurrences",
+    "flags",
+    "previous_msgctxt",
+    "previous_msgid",
+    "previous_msgid_plural",
+    "linenum",
+    "md5hash",
+)
+
+
+def dumps_pofile(po_file):
+    """
+    Serialize ``po_file`` to a compact, compressed byte string.
+
+    Rather than pickling the graph of ``POEntry`` objects, each attribute of the
+    entries is stored as a flat column of plain values, which compresses much
+    better. Use ``loads_pofile`` to load it.
+    """
+    columns = tuple(
+        [getattr(entry, field, None) for entry in po_file] for field in ENTRY_FIELDS
+    )
+    data = (
+        SERIALIZATION_VERSION,
+        tuple(getattr(po_file, field, None) for field in POFILE_FIELDS),
+        columns,
+    )
+    return zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+
+
+def loads_pofile(data):
+    """
+    Rebuild a catalog serialized by ``dumps_pofile``.
+    """
+    version, attributes, columns = pickle.loads(zlib.decompress(data))
+    if version != SERIALIZATION_VERSION:
+        raise ValueError("Unsupported catalog serialization version %r" % version)
+    po_file = POFile.__new__(POFile)
+    po_file.__dict__.update(zip(POFILE_FIELDS, attributes))
+    new_entry = POEntry.__new__
+    for values in zip(*columns):
+        entry = new_entry(POEntry)
+        entry.__dict__ = dict(zip(ENTRY_FIELDS, values))
+        po_file.append(entry)
+    return po_file
+
+
+# Large values, such as serialized catalogs, are split in chunks that fit in
+# the size limit of cache items of memcached (1MB by default), stored under a
+# manifest. The chunks of each value are stored under different keys, so that
+# a manifest never refers to the chunks of another value.
+CHUNKED_MARKER = "rosetta-chunked"
+CHUNK_SIZE = 512 * 1024
+
+
+def _chunk_keys(key, token, count):
+    return ["%s-chunk-%s-%d" % (key, token, i) for i in range(count)]
+
+
+def is_chunked(value):
+    """
+    Return whether ``value``, as read from the Rosetta cache, is the manifest
+    of a value stored with ``set_chunked``.
+    """
+    return isinstance(value, tuple) and value[:1] == (CHUNKED_MARKER,)
+
+
+def set_chunked(key, data, timeout):
+    """
+    Store the byte string ``data`` in the Rosetta cache under ``key``, in
+    chunks.
+    """
+    token = uuid.uuid4().hex
+    chunks = []
+    for start in range(0, len(data), CHUNK_SIZE):
+        end = start + CHUNK_SIZE
+        chunks.append(data[start:end])
+    keys = _chunk_keys(key, token, len(chunks))
+    cache.set_many(dict(zip(keys, chunks)), timeout)
+    cache.set(key, (CHUNKED_MARKER, token, len(chunks)), timeout)
+
+
+def get_chunked(key, manifest=None):
+    """
+    Return the byte string stored with ``set_chunked`` under ``key`` (whose
+    ``manifest`` may have been read already), or ``None`` if it's missing or
+    some of its chunks were evicted.
+    """
+    if manifest is None:
+        manifest = cache.get(key)
+    if not is_chunked(manifest):
+        return None
+    keys = _chunk_keys(key, manifest[1], manifest[2])
+    chunks = cache.get_many(keys)
+    if len(chunks) < len(keys):
+        return None
+    return b"".join(chunks[k] for k in keys)
+
+
+@timed("parse")
+def load_pofile(path, wrapwidth=78):
+    """
+    Parse the catalog at ``path``. The keys of the entries are computed, and
+    the entries indexed, when first needed.
+    """
+    version = file_version(path)
+    po_file = pofile(path, wrapwidth=wrapwidth)
+    if file_version(path) == version:
+        # The version of the file the catalog matches, see save_pofile()
+        _derived_data(po_file)["file_version"] = version
+    return po_file
+
+
+def file_version(path):
+    """
+    Return a value that changes whenever the file at ``path`` is modified or
+    replaced.
+    """
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _file_layout(po_file):
+    """
+    Return the byte spans of the header and of the entries of ``po_file`` in
+    the file it was parsed from, or ``None`` if they can't be matched to the
+    entries of the catalog.
+    """
+    scanner = POScanner(po_file.fpath, spans=True)
+    obsolete = [scanned.obsolete for scanned in scanner]
+    if (
+        scanner.crlf
+        or scanner.header_span is None
+        or (scanner.spans and scanner.spans[0][0] < scanner.header_span[0])
+        or obsolete != [entry.obsolete for entry in po_file]
+    ):
+        return None
+    return {
+        # Everything up to the end of the header entry is rewritten along with it
+        "header_end": scanner.header_span[1],
+        "starts": array("Q", [start for start, end in scanner.spans]),
+        "ends": array("Q", [end for start, end in scanner.spans]),
+    }
+
+
+# The locks serializing the changes to each catalog, by path
+_catalog_locks = {}
+_catalog_locks_lock = threading.Lock()
+
+
+def catalog_lock(path):
+    """
+    Return the (reentrant) lock of the catalog at ``path`` in this process.
+    Hold it while changing the entries of a catalog shared between threads
+    (e.g. from the process cache) and saving it.
+    """
+    with _catalog_locks_lock:
+        lock = _catalog_locks.get(path)
+        if lock is None:
+            lock = _catalog_locks[path] = threading.RLock()
+        return lock
+
+
+def _render_header(po_file):
+    header = POFile(wrapwidth=po_file.wrapwidth, encoding=po_file.encoding)
+    header.header = po_file.header
+    header.metadata = po_file.metadata
+    header.metadata_is_fuzzy = po_file.metadata_is_fuzzy
+    return str(header)
+
+
+def _can_replace(path):
+    """
+    Return whether the file at ``path`` can be replaced by a new file without
+    losing anything: it must belong to this process's user (the new file would
+    belong to it), and not have other hard links.
+    """
+    st = os.stat(path)
+    geteuid = getattr(os, "geteuid", None)
+    if geteuid is not None and st.st_uid != geteuid():
+        return False
+    return st.st_nlink == 1
+
+
+def _write_atomic(path, contents):
+    # Replace the file a symbolic link points to, not the link
+    path = os.path.realpath(path)
+    dirname, basename = os.path.split(path)
+    fd, tmppath = tempfile.mkstemp(dir=dirname, prefix=".%s." % basename)
+    try:
+        with os.fdopen(fd, "wb") as fhandle:
+            fhandle.write(contents)
+        os.chmod(tmppath, stat.S_IMODE(os.stat(path).st_mode))
+        os.replace(tmppath, path)
+    except BaseException:
+        os.remove(tmppath)
+        raise
+
+
+def _save_entries(po_file, entries, layout):
+    positions = _entry_positions(po_file)
+    changed = {positions[entry_key(entry)] for entry in entries}
+    encoding = po_file.encoding
+    with open(po_file.fpath, "rb") as fhandle:
+        contents = fhandle.read()
+
+    header = _render_header(po_file).encode(encoding)
+    chunks = [header]
+    starts, ends = layout["starts"], layout["ends"]
+    offset = layout["header_end"]
+    texts = {}
+    for position in sorted(changed):
+        start = starts[position]
+        text = po_file[position].__unicode__(po_file.wrapwidth).encode(encoding)
+        chunks.append(contents[offset:start])
+        chunks.append(text)
+        offset = ends[position]
+        texts[position] = len(text)
+    chunks.append(contents[offset:])
+    _write_atomic(po_file.fpath, b"".join(chunks))
+
+    # Move the spans of the entries to where they now are
+    shift = len(header) - layout["header_end"]
+    layout["header_end"] = len(header)
+    for position in range(len(starts)):
+        start = starts[position] + shift
+        if position in texts:
+            shift += texts[position] - (ends[position] - starts[position])
+        starts[position] = start
+        ends[position] += shift
+
+
+@timed("save")
+def save_pofile(po_file, entries=None):
+    """
+    Save ``po_file`` to the file it was parsed from.
+
+    When the changed ``entries`` are given and the file wasn't modified since
+    the catalog was parsed (or last saved), only the header and those entries
+    are rewritten, leaving the rest of the file as it is. The file (or the file
+    a symbolic link points to) is then replaced atomically, unless it belongs to
+    another user or has other hard links. Otherwise, the whole catalog is
+    written out in place by polib.
+    """
+    data = _derived_data(po_file)
+    path = po_file.fpath
+    positions = _entry_positions(po_file)
+    # The file is read, spliced and written, and the layout updated, by one
+    # thread at a time
+    with catalog_lock(path):
+        if (
+            entries is not None
+            and data.get("file_version") == file_version(path)
+            and all(entry_key(entry) in positions for entry in entries)
+            and _can_replace(path)
+        ):
+            try:
+                layout = data.get("layout")
+                if layout is None:
+                    layout = data["layout"] = _file_layout(po_file)
+                if layout is not None:
+                    _save_entries(po_file, entries, layout)
+                    data["file_version"] = file_version(path)
+                    return
+            except OSError:
+                # e.g. the directory isn't writable: write the file in place
+                pass
+            except BaseException:
+                # The layout may be half updated
+                data.pop("layout", None)
+                data.pop("file_version", None)
+                raise
+        data.pop("layout", None)
+        data.pop("file_version", None)
+        po_file.save()
+        data["file_version"] = file_version(path)
+
+
+SHARED_CATALOG_TIMEOUT = 86400
+
+
+def _shared_cache_key(path, wrapwidth, version):
+    return "rosetta-catalog-%s" % (
+        hashlib.md5(
+            ("%s:%d:%d:%d" % (path, wrapwidth, version[0], version[1])).encode("utf8")
+        ).hexdigest()
+    )
+
+
+def load_shared_pofile(path, wrapwidth, version):
+    """
+    Return the catalog at ``path``, whose ``file_version`` was ``version``.
+
+    Unless ``ROSETTA_SHARED_CATALOG_CACHE`` is disabled, catalogs are shared by
+    all the processes through the Rosetta cache, keyed by their path, wrap
+    width, modification time and size: each version of a catalog is only parsed
+    once, by the first process that needs it.
+    """
+    if not rosetta_settings.SHARED_CATALOG_CACHE:
+        return load_pofile(path, wrapwidth=wrapwidth)
+
+    key = _shared_cache_key(path, wrapwidth, version)
+    with timed("load"):
+        data = get_chunked(key)
+        po_file = loads_pofile(data) if data is not None else None
+    if po_file is not None:
+        if file_version(path) == version:
+            _derived_data(po_file)["file_version"] = version
+        return po_file
+
+    po_file = load_pofile(path, wrapwidth=wrapwidth)
+    # Only share a catalog that matches the version it's keyed by
+    if _derived_data(po_file).get("file_version") == version:
+        with timed("load"):
+            set_chunked(key, dumps_pofile(po_file), SHARED_CATALOG_TIMEOUT)
+    return po_file
+
+
+class POFileCache(object):
+    """
+    A bounded, thread-safe, process-local LRU cache of parsed catalogs (along
+    with their index and entry keys, once computed).
+
+    Catalogs are keyed by their path and wrap width, and are only returned for
+    as long as the file on disk is unchanged (same modification time, size and
+    inode). The cache holds at most ``ROSETTA_POFILE_CACHE_MAX_ENTRIES``
+    catalogs, weighing together at most ``ROSETTA_POFILE_CACHE_MAX_BYTES`` bytes
+    on disk.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def get(self, path, wrapwidth):
+        """
+        Return the parsed catalog at ``path``, parsing it (again) if it's not
+        cached or it changed on disk.
+        """
+        key = (path, wrapwidth)
+        version = file_version(path)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(key)
+                return cached[1]
+
+        po_file = load_shared_pofile(path, wrapwidth, version)
+        # Don't cache a catalog that changed while we were loading it
+        if file_version(path) == version:
+            self._put(key, version, po_file)
+        return po_file
+
+    def update(self, path, wrapwidth, po_file):
+        """
+        Store a catalog that was just saved to ``path``, so that it doesn't need
+        to be parsed again.
+        """
+        self._put((path, wrapwidth), file_version(path), po_file)
+
+    def discard(self, path):
+        """
+        Forget all the parsed versions of the catalog at ``path``.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == path]:
+                self._size -= self._entries.pop(key)[0][1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _put(self, key, version, po_file):
+        max_entries = rosetta_settings.POFILE_CACHE_MAX_ENTRIES
+        max_bytes = rosetta_settings.POFILE_CACHE_MAX_BYTES
+        with self._lock:
+            cached = self._entries.pop(key, None)
+            if cached is not None:
+                self._size -= cached[0][1]
+            if not max_entries or version[1] > max_bytes:
+                return
+            self._entries[key] = (version, po_file)
+            self._size += version[1]
+            while len(self._entries) > max_entries or self._size > max_bytes:
+                self._size -= self._entries.popitem(last=False)[1][0][1]
+
+
+# The cache of this process
+po_file_cache = POFileCache()
@@ -1,14 +1,20 @@
+import hashlib
 import os
+import re
+import stat
 import tempfile
+from collections import namedtuple
 from datetime import datetime
 
 import django
 from django.apps import apps
 from django.conf import ENVIRONMENT_VARIABLE, settings
 from django.core.cache import caches
+from django.core.signals import setting_changed
 from django.utils import timezone
 
 from rosetta.conf import settings as rosetta_settings
+from rosetta.timing import timed
 
 
 cache = caches[rosetta_settings.ROSETTA_CACHE_NAME]
@@ -30,13 +36,100 @@ def timestamp_with_timezone(dt=None):
     return dt.strftime("%Y-%m-%d %H:%M%z")
 
 
-def find_pos(lang, project_apps=True, django_apps=False, third_party_apps=False):
+# Results of find_pos(), keyed by its arguments and by the settings and app
+# registry the scan depends on. Each value also carries the modification times
+# of the directories that were looked at, so that catalogs added or removed on
+# disk are picked up on the next call.
+_find_pos_cache = {}
+
+# Result of the case sensitivity probe, done once per process.
+_case_sensitive_file_system = None
+
+
+def clear_find_pos_cache(*args, **kwargs):
     """
-    scans a couple possible repositories of gettext catalogs for the given
-    language code
+    Forget all the cached catalog discovery results. Connected to the
+    ``setting_changed`` signal.
+    """
+    global _case_sensitive_file_system
+    _find_pos_cache.clear()
+    _case_sensitive_file_system = None
+
+
+setting_changed.connect(clear_find_pos_cache)
+
+
+def is_case_sensitive_file_system():
+    """
+    Return whether the file system holding the catalogs is case sensitive.
+    The ``ROSETTA_CASE_SENSITIVE_FILESYSTEM`` setting is preferred over auto
+    detection, which is only attempted once per process.
+    """
+    global _case_sensitive_file_system
+
+    case_sensitive_file_system = getattr(
+        settings, "ROSETTA_CASE_SENSITIVE_FILESYSTEM", None
+    )
+    if case_sensitive_file_system is not None:
+        return case_sensitive_file_system
+
+    if _case_sensitive_file_system is None:
+        tmphandle, tmppath = tempfile.mkstemp()
+        try:
+            # Case insensitive file system if the upper-cased path exists too
+            _case_sensitive_file_system = not os.path.exists(tmppath.upper())
+        finally:
+            os.close(tmphandle)
+            os.remove(tmppath)
+    return _case_sensitive_file_system
 
+
+def _stat_dir(path, watched):
+    """
+    Record the modification time of ``path`` (or ``None`` if it doesn't exist)
+    in ``watched`` and return whether it is a directory.
     """
+    try:
+        st = os.stat(path)
+    except OSError:
+        watched[path] = None
+        return False
+    watched[path] = st.st_mtime_ns
+    return stat.S_ISDIR(st.st_mode)
+
+
+def _is_fresh(watched):
+    for path, mtime in watched.items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            if mtime is not None:
+                return False
+    return True
 
+
+def _find_pos_cache_key(langs, project_apps, django_apps, third_party_apps):
+    return (
+        langs,
+        project_apps,
+        django_apps,
+        third_party_apps,
+        settings.SETTINGS_MODULE or os.environ.get(ENVIRONMENT_VARIABLE),
+        tuple(settings.LOCALE_PATHS),
+        tuple(rosetta_settings.POFILENAMES),
+        tuple(rosetta_settings.EXCLUDED_APPLICATIONS or ()),
+        tuple(rosetta_settings.ROSETTA_EXCLUDED_PATHS or ()),
+        getattr(settings, "ROSETTA_CASE_SENSITIVE_FILESYSTEM", None),
+        tuple((app_.name, app_.path) for app_ in apps.get_app_configs()),
+    )
+
+
+def _locale_paths(project_apps, django_apps, third_party_apps, watched):
+    """
+    Return the normalized list of existing locale directories to be searched
+    for catalogs, according to the given filters.
+    """
     paths = []
 
     # project/locale
@@ -52,37 +145,14 @@ def find_pos(lang, project_apps=True, django_apps=False, third_party_apps=False)
         os.path.abspath(os.path.dirname(project.__file__))
     )
     if project_apps:
-        if os.path.exists(
-            os.path.abspath(os.path.join(os.path.dirname(project.__file__), "locale"))
-        ):
-            paths.append(
-                os.path.abspath(
-                    os.path.join(os.path.dirname(project.__file__), "locale")
-                )
-            )
-        if os.path.exists(
+        for path in (
+            os.path.abspath(os.path.join(os.path.dirname(project.__file__), "locale")),
             os.path.abspath(
                 os.path.join(os.path.dirname(project.__file__), "..", "locale")
-            )
+            ),
         ):
-            paths.append(
-                os.path.abspath(
-                    os.path.join(os.path.dirname(project.__file__), "..", "locale")
-                )
-            )
-
-    # is OS case sensitive? settings preferred over auto detection
-    case_sensitive_file_system = getattr(
-        settings, "ROSETTA_CASE_SENSITIVE_FILESYSTEM", None
-    )
-
-    # in case of no settings, attempt auto detection
-    if case_sensitive_file_system is None:
-        case_sensitive_file_system = True
-        tmphandle, tmppath = tempfile.mkstemp()
-        if os.path.exists(tmppath.upper()):
-            # Case insensitive file system.
-            case_sensitive_file_system = False
+            if _stat_dir(path, watched):
+                paths.append(path)
 
     # django/locale
     if django_apps:
@@ -96,10 +166,12 @@ def find_pos(lang, project_apps=True, django_apps=False, third_party_apps=False)
                     django_paths.append(os.path.join(root, "locale"))
                     continue
             cache.set("rosetta_django_paths", django_paths, 60 * 60)
+        for path in django_paths:
+            _stat_dir(path, watched)
         paths = paths + django_paths
     # settings
     for localepath in settings.LOCALE_PATHS:
-        if os.path.isdir(localepath):
+        if _stat_dir(localepath, watched):
             paths.append(localepath)
 
     # project/app/locale
@@ -123,12 +195,26 @@ def find_pos(lang, project_apps=True, django_apps=False, third_party_apps=False)
         if not project_apps and abs_project_path in app_path:
             continue
 
-        if os.path.exists(os.path.abspath(os.path.join(app_path, "locale"))):
-            paths.append(os.path.abspath(os.path.join(app_path, "locale")))
-        if os.path.exists(os.path.abspath(os.path.join(app_path, "..", "locale"))):
-            paths.append(os.path.abspath(os.path.join(app_path, "..", "locale")))
+        for path in (
+            os.path.abspath(os.path.join(app_path, "locale")),
+            os.path.abspath(os.path.join(app_path, "..", "locale")),
+        ):
+            if _stat_dir(path, watched):
+                paths.append(path)
 
-    ret = set()
+    paths = map(os.path.normpath, paths)
+    return [
+        path
+        for path in sorted(set(paths))
+        if path not in rosetta_settings.ROSETTA_EXCLUDED_PATHS
+    ]
+
+
+def _lang_variants(lang):
+    """
+    Return the locale directory names a catalog for ``lang`` could live in,
+    e.g. ``de-de``, ``de_de``, ``de_DE`` and ``de_De`` for ``de-de``.
+    """
     langs = [lang]
     if "-" in lang:
         _l, _c = map(lambda x: x.lower(), lang.split("-", 1))
@@ -144,27 +230,348 @@ def find_pos(lang, project_apps=True, django_apps=False, third_party_apps=False)
             "%s-%s" % (_l, _c.upper()),
             "%s_%s" % (_l, _c.capitalize()),
         ]
+    return langs
 
-    paths = map(os.path.normpath, paths)
-    paths = list(set(paths))
+
+def _scandir_names(path, watched):
+    """
+    Return ``{name: DirEntry}`` for the contents of the directory at ``path``,
+    recording its modification time in ``watched``.
+    """
+    if not _stat_dir(path, watched):
+        return {}
+    try:
+        with os.scandir(path) as it:
+            return {entry.name: entry for entry in it}
+    except OSError:
+        return {}
+
+
+@timed("find-pos")
+def find_pos_many(langs, project_apps=True, django_apps=False, third_party_apps=False):
+    """
+    scans a couple possible repositories of gettext catalogs for all the given
+    language codes at once, and returns a ``{language_code: [paths]}`` mapping
+
+    Each locale directory is only listed once, whatever the number of
+    languages. Results are cached per process, and reused for as long as none
+    of the scanned directories was modified.
+    """
+    langs = tuple(langs)
+    key = _find_pos_cache_key(langs, project_apps, django_apps, third_party_apps)
+    cached = _find_pos_cache.get(key)
+    if cached is not None:
+        watched, ret = cached
+        if _is_fresh(watched):
+            return {lang: list(paths) for lang, paths in ret.items()}
+
+    # every directory we look into, whether it exists or not, and its mtime
+    watched = {}
+    paths = _locale_paths(project_apps, django_apps, third_party_apps, watched)
+
+    # is OS case sensitive? settings preferred over auto detection
+    case_sensitive_file_system = is_case_sensitive_file_system()
+    if case_sensitive_file_system:
+        normalize = str
+    else:
+        # On case insensitive filesystems (looking at you, MacOS) the
+        # directory and file names are compared in lowercase.
+        # This is not an issue on sane filesystems
+        normalize = str.lower
+
+    # locale directory name -> languages it could hold catalogs for
+    dirnames = {}
+    for lang in langs:
+        for lang_ in _lang_variants(lang):
+            lang_langs = dirnames.setdefault(normalize(lang_), [])
+            if lang not in lang_langs:
+                lang_langs.append(lang)
+    filenames = {normalize(fn) for fn in rosetta_settings.POFILENAMES}
+
+    ret = {lang: set() for lang in langs}
     for path in paths:
-        # Exclude paths
-        if path not in rosetta_settings.ROSETTA_EXCLUDED_PATHS:
-            for lang_ in langs:
-                dirname = os.path.join(path, lang_, "LC_MESSAGES")
-                for fn in rosetta_settings.POFILENAMES:
-                    filename = os.path.join(dirname, fn)
-                    abs_path = os.path.abspath(filename)
-                    # On case insensitive filesystems (looking at you, MacOS)
-                    # compare the lowercase absolute path of the po file
-                    # to all lowercased paths already collected.
-                    # This is not an issue on sane filesystems
-                    if not case_sensitive_file_system:
-                        if filename.lower() in [p.lower() for p in ret]:
-                            continue
-                    if os.path.isfile(abs_path):
-                        ret.add(abs_path)
-    return list(sorted(ret))
+        for name, entry in _scandir_names(path, watched).items():
+            if normalize(name) not in dirnames or not entry.is_dir():
+                continue
+            lang_path = os.path.join(path, name)
+            messages_path = os.path.join(lang_path, "LC_MESSAGES")
+            _stat_dir(lang_path, watched)
+            for fn, fn_entry in _scandir_names(messages_path, watched).items():
+                if normalize(fn) in filenames and fn_entry.is_file():
+                    abs_path = os.path.abspath(os.path.join(messages_path, fn))
+                    for lang in dirnames[normalize(name)]:
+                        ret[lang].add(abs_path)
+
+    if not case_sensitive_file_system:
+        # the same catalog could have been found through differently cased
+        # locale paths
+        for lang, lang_paths in ret.items():
+            unique = {}
+            for lang_path in sorted(lang_paths):
+                unique.setdefault(lang_path.lower(), lang_path)
+            ret[lang] = set(unique.values())
+
+    ret = {lang: tuple(sorted(lang_paths)) for lang, lang_paths in ret.items()}
+    _find_pos_cache[key] = (watched, ret)
+    return {lang: list(lang_paths) for lang, lang_paths in ret.items()}
+
+
+def find_pos(lang, project_apps=True, django_apps=False, third_party_apps=False):
+    """
+    scans a couple possible repositories of gettext catalogs for the given
+    language code
+
+    """
+    return find_pos_many(
+        [lang],
+        project_apps=project_apps,
+        django_apps=django_apps,
+        third_party_apps=third_party_apps,
+    )[lang]
+
+
+# Translation state of a single catalog entry, as returned by POScanner
+ScannedEntry = namedtuple("ScannedEntry", ["translated", "fuzzy", "obsolete", "plural"])
+
+_unescape_rx = re.compile(r'\\(\\|n|t|r|v|b|f|")')
+_unescapes = {"n": "\n", "t": "\t", "r": "\r", "v": "\v", "b": "\b", "f": "\f"}
+
+
+def _unescape(value):
+    return _unescape_rx.sub(lambda m: _unescapes.get(m.group(1), m.group(1)), value)
+
+
+class POScanner(object):
+    """
+    Streaming reader for .po files, that only keeps track of the translation
+    state of each entry without building any ``POEntry`` object.
+
+    Iterating over a scanner reads the file line by line and yields a
+    ``ScannedEntry`` for each entry of the catalog, in file order. The header
+    is not yielded, its metadata is available in ``metadata`` once it was read,
+    matching what polib puts in ``POFile.metadata``.
+
+    With ``spans=True``, the scanner also records the byte span ``(start,
+    end)`` of each yielded entry in ``spans``, and the one of the header in
+    ``header_span``. ``crlf`` tells whether any line has a Windows line ending.
+    """
+
+    def __init__(self, fpath, spans=False):
+        self.fpath = fpath
+        self.metadata = {}
+        self.metadata_is_fuzzy = False
+        self.spans = [] if spans else None
+        self.header_span = None
+        self.crlf = False
+        self._header_found = False
+
+    def __iter__(self):
+        with open(self.fpath, "rb") as fhandle:
+            entry = None
+            offset = 0
+            for line in fhandle:
+                start, offset = offset, offset + len(line)
+                if self.spans is not None and line.endswith(b"\r\n"):
+                    self.crlf = True
+                line = line.strip()
+                if not line:
+                    if entry is not None:
+                        yield from self._finish(entry)
+                        entry = None
+                    continue
+
+                obsolete = line.startswith(b"#~")
+                if obsolete:
+                    line = line[2:].lstrip()
+                    if not line or line.startswith(b"|"):
+                        if entry is not None:
+                            entry["end"] = offset
+                        continue
+
+                if line.startswith(b"#"):
+                    # a comment after a translation starts a new entry
+                    if entry is not None and entry["field"] is not None:
+                        yield from self._finish(entry)
+                        entry = None
+                    if entry is None:
+                        entry = self._new_entry(start)
+                    entry["end"] = offset
+                    if line.startswith(b"#,") and b"fuzzy" in [
+                        flag.strip() for flag in line[2:].split(b",")
+                    ]:
+                        entry["fuzzy"] = True
+                    continue
+
+                if line.startswith(b'"'):
+                    # continuation of the current field
+                    if entry is not None and entry["field"] is not None:
+                        self._add_value(entry, line)
+                        entry["end"] = offset
+                    continue
+
+                keyword, _, value = line.partition(b" ")
+                if keyword.startswith(b"msgstr"):
+                    field = keyword
+                elif keyword in (b"msgctxt", b"msgid", b"msgid_plural"):
+                    if entry is not None and (entry["field"] or b"").startswith(
+                        b"msgstr"
+                    ):
+                        yield from self._finish(entry)
+                        entry = None
+                    field = keyword
+                else:
+                    raise IOError(
+                        "Syntax error in po file %s: unknown keyword %s"
+                        % (self.fpath, keyword.decode("ascii", "replace"))
+                    )
+                if entry is None:
+                    entry = self._new_entry(start)
+                entry["end"] = offset
+                entry["obsolete"] = entry["obsolete"] or obsolete
+                entry["field"] = field
+                entry["values"][field] = []
+                self._add_value(entry, value.strip())
+
+            if entry is not None:
+                yield from self._finish(entry)
+
+    def _new_entry(self, start):
+        return {
+            "fuzzy": False,
+            "obsolete": False,
+            "field": None,
+            "values": {},
+            "start": start,
+            "end": start,
+        }
+
+    def _add_value(self, entry, quoted):
+        entry["values"][entry["field"]].append(quoted[1:-1])
+
+    def _finish(self, entry):
+        values = entry["values"]
+        if b"msgid" not in values:
+            # only comments
+            return
+        msgid_empty = not any(values[b"msgid"])
+        if (
+            not self._header_found
+            and msgid_empty
+            and not entry["obsolete"]
+            and b"msgid_plural" not in values
+        ):
+            self._header_found = True
+            self.header_span = (entry["start"], entry["end"])
+            self.metadata_is_fuzzy = entry["fuzzy"]
+            self._parse_metadata(b"".join(values.get(b"msgstr", [])))
+            return
+
+        plurals = [v for k, v in values.items() if k.startswith(b"msgstr[")]
+        plural = b"msgid_plural" in values
+        if any(values.get(b"msgstr", [])):
+            translated = True
+        elif plurals:
+            translated = all(any(v) for v in plurals)
+        else:
+            translated = False
+        translated = translated and not entry["fuzzy"] and not entry["obsolete"]
+        if self.spans is not None:
+            self.spans.append((entry["start"], entry["end"]))
+        yield ScannedEntry(translated, entry["fuzzy"], entry["obsolete"], plural)
+
+    def _parse_metadata(self, raw):
+        charset = "utf-8"
+        match = re.search(rb"charset=([\w-]+)", raw)
+        if match:
+            charset = match.group(1).decode("ascii")
+        try:
+            msgstr = _unescape(raw.decode(charset))
+        except (LookupError, UnicodeDecodeError):
+            msgstr = _unescape(raw.decode("utf-8", "replace"))
+        key = None
+        for msg in msgstr.splitlines():
+            try:
+                key, val = msg.split(":", 1)
+                self.metadata[key] = val.strip()
+            except (ValueError, KeyError):
+                if key is not None:
+                    self.metadata[key] += "\n" + msg.strip()
+
+
+def _stats(states):
+    translated = untranslated = fuzzy = obsolete = 0
+    for is_obsolete, is_fuzzy, is_translated in states:
+        if is_obsolete:
+            obsolete += 1
+        elif is_fuzzy:
+            fuzzy += 1
+        elif is_translated:
+            translated += 1
+        else:
+            untranslated += 1
+    total = translated + untranslated + fuzzy
+    return {
+        "translated": translated,
+        "untranslated": untranslated,
+        "fuzzy": fuzzy,
+        "obsolete": obsolete,
+        "messages": translated + untranslated,
+        "percent_translated": int(translated * 100 / float(total)) if total else 100,
+    }
+
+
+def compute_pofile_stats(po_file):
+    """
+    Count the translated, untranslated, fuzzy and obsolete entries of the
+    given parsed catalog in a single pass, and compute its translation
+    progress the same way ``POFile.percent_translated`` does.
+    """
+    return _stats((e.obsolete, e.fuzzy, e.translated()) for e in po_file)
+
+
+def scan_pofile_stats(path):
+    """
+    Same as ``compute_pofile_stats``, for the catalog at ``path``, which is
+    read with a ``POScanner`` rather than fully parsed.
+    """
+    return _stats((e.obsolete, e.fuzzy, e.translated) for e in POScanner(path))
+
+
+def _pofile_stats_cache_key(path):
+    realpath = os.path.realpath(path)
+    st = os.stat(realpath)
+    return "rosetta-pofile-stats-%s" % (
+        hashlib.md5(
+            ("%s:%d:%d" % (realpath, st.st_mtime_ns, st.st_size)).encode("utf8")
+        ).hexdigest()
+    )
+
+
+@timed("stats")
+def pofile_stats_many(paths):
+    """
+    Return ``{path: stats}`` for the given catalog paths (see
+    ``compute_pofile_stats``).
+
+    Statistics are stored in the Rosetta cache, keyed by the real path,
+    modification time and size of each file: only the catalogs that changed
+    since they were last seen are parsed again.
+    """
+    keys = {path: _pofile_stats_cache_key(path) for path in paths}
+    cached = cache.get_many(list(keys.values()))
+    ret, missing = {}, {}
+    for path, key in keys.items():
+        if key in cached:
+            ret[path] = cached[key]
+        else:
+            ret[path] = missing[key] = scan_pofile_stats(path)
+    if missing:
+        cache.set_many(missing, 86400)
+    return ret
+
+
+def pofile_stats(path):
+    return pofile_stats_many([path])[path]
 
 
 def pagination_range(first, last, current):
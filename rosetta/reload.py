@@ -0,0 +1,50 @@
+import gettext
+import os
+
+from django.conf import settings
+from django.utils import translation
+from django.utils.translation import to_locale, trans_real
+
+
+def _is_affected(locale, changed_locale):
+    # The catalogs of a language are merged into the ones of its variants
+    # (e.g. "de" into "de_AT")
+    locale, changed_locale = locale.lower(), changed_locale.lower()
+    return locale == changed_locale or locale.split("_")[0] == changed_locale
+
+
+def reload_language(language_code):
+    """
+    Make this process load the .mo files of the given language again, the next
+    time its translations are used, without touching the other languages.
+
+    The translations of the default language (``LANGUAGE_CODE``) are the
+    fallback of all the other languages, so they are all reloaded when it
+    changes.
+    """
+    changed_locale = to_locale(language_code)
+    reload_all = _is_affected(to_locale(settings.LANGUAGE_CODE), changed_locale)
+
+    # The translation objects of Django...
+    for language in list(trans_real._translations):
+        if reload_all or _is_affected(to_locale(language), changed_locale):
+            trans_real._translations.pop(language, None)
+    if reload_all:
+        trans_real._default = None
+
+    # ... and the parsed .mo files, cached by gettext (e.g. for the JavaScript
+    # catalogs)
+    for key in list(gettext._translations):
+        mofile = key[-1]
+        # .../<locale>/LC_MESSAGES/<domain>.mo
+        locale = os.path.basename(os.path.dirname(os.path.dirname(mofile)))
+        if reload_all or _is_affected(locale, changed_locale):
+            gettext._translations.pop(key, None)
+
+    # The translation activated in this thread is replaced right away, the ones
+    # of the other threads when they activate a language for their next request
+    active_language = translation.get_language()
+    if active_language and (
+        reload_all or _is_affected(to_locale(active_language), changed_locale)
+    ):
+        translation.activate(active_language)
@@ -6,3 +6,9 @@ entry_changed = dispatch.Signal()
 
 # providing_args=["language_code", "request"]
 post_save = dispatch.Signal()
+
+# providing_args=["po_path", "language_code"]
+catalog_invalidated = dispatch.Signal()
+
+# providing_args=["request", "po_path", "entry_count", "timings"]
+timings_recorded = dispatch.Signal()
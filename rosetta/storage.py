@@ -1,16 +1,36 @@
 import hashlib
 import importlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import tempfile
 import time
+import uuid
+from contextlib import contextmanager
 
 from django.conf import settings
 from django.core.cache import caches
 from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, transaction
 
 from .conf import settings as rosetta_settings
 
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
 cache = caches[rosetta_settings.ROSETTA_CACHE_NAME]
 
+_MISSING = object()
+
+# Whether the cache was found to work, see CacheRosettaStorage
+_cache_checked = False
+
 
 class BaseRosettaStorage(object):
     def __init__(self, request):
@@ -28,6 +48,38 @@ class BaseRosettaStorage(object):
     def delete(self, key):
         raise NotImplementedError
 
+    def get_many(self, keys):
+        """Return a dictionary of the values stored under the given keys,
+        leaving out the missing ones.
+        """
+        ret = {}
+        for key in keys:
+            val = self.get(key, _MISSING)
+            if val is not _MISSING:
+                ret[key] = val
+        return ret
+
+    def set_many(self, mapping):
+        for key, val in mapping.items():
+            self.set(key, val)
+
+    def delete_many(self, keys):
+        for key in keys:
+            if self.has(key):
+                self.delete(key)
+
+    def get_overlay(self, po_path, language_code):
+        """Return the changes made to the (read-only) catalog at ``po_path``,
+        as an overlay (see ``rosetta.pocache.overlay_pofile``).
+        """
+        return self.get("po-overlay-%s" % po_path, None) or {}
+
+    def set_overlay(self, po_path, language_code, overlay, changed_keys):
+        """Store the overlay of the catalog at ``po_path``, after the entries
+        with the given keys were changed.
+        """
+        self.set("po-overlay-%s" % po_path, overlay)
+
 
 class DummyRosettaStorage(BaseRosettaStorage):
     def get(self, key, default=None):
@@ -69,6 +121,10 @@ class SessionRosettaStorage(BaseRosettaStorage):
     def delete(self, key):
         del self.request.session[key]
 
+    def delete_many(self, keys):
+        for key in keys:
+            self.request.session.pop(key, None)
+
 
 class CacheRosettaStorage(BaseRosettaStorage):
     # unlike the session storage backend, cache is shared among all users
@@ -98,15 +154,18 @@ class CacheRosettaStorage(BaseRosettaStorage):
                 "You can't use the CacheRosettaStorage if your cache isn't correctly set up (you are using the DummyCache cache backend)."
             )
 
-        # Make sure the cache actually works
-        try:
-            self.set("rosetta_cache_test", "rosetta")
-            if not self.get("rosetta_cache_test") == "rosetta":
-                raise ImproperlyConfigured(
-                    "You can't use the CacheRosettaStorage if your cache isn't correctly set up, please double check your Django DATABASES setting and that the cache server is responding."
-                )
-        finally:
-            self.delete("rosetta_cache_test")
+        # Make sure the cache actually works (once per process)
+        global _cache_checked
+        if not _cache_checked:
+            try:
+                self.set("rosetta_cache_test", "rosetta")
+                if not self.get("rosetta_cache_test") == "rosetta":
+                    raise ImproperlyConfigured(
+                        "You can't use the CacheRosettaStorage if your cache isn't correctly set up, please double check your Django DATABASES setting and that the cache server is responding."
+                    )
+            finally:
+                self.delete("rosetta_cache_test")
+            _cache_checked = True
 
     def get(self, key, default=None):
         # print ('get', self._key_prefix + key)
@@ -124,6 +183,429 @@ class CacheRosettaStorage(BaseRosettaStorage):
         # print ('del', self._key_prefix + key)
         cache.delete(self._key_prefix + key)
 
+    def get_many(self, keys):
+        vals = cache.get_many([self._key_prefix + key for key in keys])
+        return {
+            key: vals[self._key_prefix + key]
+            for key in keys
+            if self._key_prefix + key in vals
+        }
+
+    def set_many(self, mapping):
+        if mapping:
+            cache.set_many(
+                {self._key_prefix + key: val for key, val in mapping.items()}, 86400
+            )
+
+    def delete_many(self, keys):
+        cache.delete_many([self._key_prefix + key for key in keys])
+
+
+class DatabaseRosettaStorage(SessionRosettaStorage):
+    """Keeps the changes made to read-only catalogs in the database, one row
+    per entry (see ``rosetta.models.EntryEdit``), so that they're shared by all
+    the users and servers until they're exported to the catalogs by the
+    ``rosetta_export_edits`` management command. Other values are kept in the
+    session.
+    """
+
+    def get_overlay(self, po_path, language_code):
+        from .models import EntryEdit
+
+        return EntryEdit.objects.filter(
+            po_path=po_path, language_code=language_code
+        ).overlay()
+
+    def set_overlay(self, po_path, language_code, overlay, changed_keys):
+        from .models import EntryEdit
+
+        edits = EntryEdit.objects.filter(po_path=po_path, language_code=language_code)
+        user = self.request.user if self.request.user.is_authenticated else None
+        # Entries changed back to their translation in the catalog
+        reverted_keys = [key for key in changed_keys if key not in overlay]
+
+        unique_fields = None
+        if connections[
+            EntryEdit.objects.db
+        ].features.supports_update_conflicts_with_target:
+            unique_fields = ["po_path", "language_code", "entry_key"]
+        with transaction.atomic(using=EntryEdit.objects.db):
+            # The edits are locked until they're updated, so that concurrent
+            # changes of an entry get different versions
+            versions = dict(
+                edits.select_for_update()
+                .filter(entry_key__in=changed_keys)
+                .values_list("entry_key", "version")
+            )
+            rows = [
+                EntryEdit(
+                    po_path=po_path,
+                    language_code=language_code,
+                    entry_key=key,
+                    msgstr=overlay[key][0],
+                    msgstr_plural=overlay[key][1],
+                    fuzzy=overlay[key][2],
+                    version=versions.get(key, 0) + 1,
+                    updated_by=user,
+                )
+                for key in changed_keys
+                if key in overlay
+            ]
+            EntryEdit.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=[
+                    "msgstr",
+                    "msgstr_plural",
+                    "fuzzy",
+                    "version",
+                    "updated_by",
+                    "updated_at",
+                ],
+            )
+            if reverted_keys:
+                edits.filter(entry_key__in=reverted_keys).delete()
+
+
+# The format of the files of FileRosettaStorage: a header (magic, version and
+# number of values), an index of the values sorted by the MD5 digest of their
+# key (digest, offset and length), then the values themselves, each made of a
+# type byte followed by the serialized value. Each entry of an overlay is a
+# value of its own, in JSON, along with the list of the keys of the overlay.
+FILE_MAGIC = b"RSTG"
+FILE_VERSION = 2
+FILE_HEADER = struct.Struct("<4sBI")
+FILE_INDEX_ENTRY = struct.Struct("<16sQQ")
+VALUE_PICKLE, VALUE_JSON = 0, 1
+
+
+def _key_digest(key):
+    return hashlib.md5(key.encode("utf8")).digest()
+
+
+def _encode_value(val):
+    return bytes([VALUE_PICKLE]) + pickle.dumps(val, pickle.HIGHEST_PROTOCOL)
+
+
+def _encode_json(val):
+    return bytes([VALUE_JSON]) + json.dumps(val, separators=(",", ":")).encode("utf8")
+
+
+def _decode_value(record):
+    payload = record[1:]
+    try:
+        if record[0] == VALUE_JSON:
+            return json.loads(bytes(payload))
+        return pickle.loads(payload)
+    finally:
+        payload.release()
+
+
+def _read_value(data, view, key, default=None):
+    """Return the value stored under ``key`` in the memory-mapped file
+    ``data`` (of which ``view`` is a memoryview), or ``default``.
+    """
+    position = _find_record(data, _key_digest(key))
+    if position is None:
+        return default
+    start, end = position
+    with view[start:end] as record:
+        return _decode_value(record)
+
+
+def _map_file(path):
+    """Return a read-only memory map of the file at ``path``, or ``None`` if it
+    doesn't exist or isn't a valid storage file.
+    """
+    try:
+        with open(path, "rb") as fhandle:
+            data = mmap.mmap(fhandle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        # (mmap raises a ValueError for empty files)
+        return None
+    if len(data) < FILE_HEADER.size or FILE_HEADER.unpack_from(data)[:2] != (
+        FILE_MAGIC,
+        FILE_VERSION,
+    ):
+        data.close()
+        return None
+    return data
+
+
+def _index_entries(data):
+    count = FILE_HEADER.unpack_from(data)[2]
+    for i in range(count):
+        yield FILE_INDEX_ENTRY.unpack_from(
+            data, FILE_HEADER.size + i * FILE_INDEX_ENTRY.size
+        )
+
+
+def _find_record(data, digest):
+    """Return the position of the value with the given key digest in the
+    memory-mapped file ``data``, by binary search of its index, or ``None``.
+    """
+    low, high = 0, FILE_HEADER.unpack_from(data)[2]
+    while low < high:
+        middle = (low + high) // 2
+        entry_digest, offset, length = FILE_INDEX_ENTRY.unpack_from(
+            data, FILE_HEADER.size + middle * FILE_INDEX_ENTRY.size
+        )
+        if entry_digest < digest:
+            low = middle + 1
+        elif entry_digest > digest:
+            high = middle
+        else:
+            return offset, offset + length
+    return None
+
+
+def _storage_directory():
+    """Return the directory of ``FileRosettaStorage``, creating it if needed.
+
+    The values are unpickled from its files, so it must only be writable by the
+    user of the process: it's created with mode 0o700, and refused if it belongs
+    to another user or is writable by its group or others.
+    """
+    directory = rosetta_settings.STORAGE_DIR or os.path.join(
+        tempfile.gettempdir(), "rosetta-storage"
+    )
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.stat(directory)
+    geteuid = getattr(os, "geteuid", None)
+    if (geteuid is not None and st.st_uid != geteuid()) or st.st_mode & 0o022:
+        raise ImproperlyConfigured(
+            "The storage directory %s must belong to the user of the process and "
+            "must not be writable by its group or others." % directory
+        )
+    return directory
+
+
+@contextmanager
+def _file_lock(path):
+    with open(path, "ab") as fhandle:
+        if fcntl is not None:
+            fcntl.flock(fhandle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fhandle, fcntl.LOCK_UN)
+
+
+class FileRosettaStorage(BaseRosettaStorage):
+    """Keeps the values of each user in a file of ``ROSETTA_STORAGE_DIR``, in
+    an indexed binary format (see ``FILE_MAGIC``).
+
+    Files are memory-mapped when read: a value is found by a binary search of
+    the index, and only that value is deserialized, straight from the mapped
+    file. The entries of overlays are stored as values of their own, so that
+    only the changed ones are serialized when an overlay is stored. Files are
+    replaced atomically when written, under a lock, so that several processes
+    of a host can share the directory.
+    """
+
+    def __init__(self, request):
+        super(FileRosettaStorage, self).__init__(request)
+        if "rosetta_file_storage_key_prefix" in self.request.session:
+            key_prefix = self.request.session["rosetta_file_storage_key_prefix"]
+        else:
+            key_prefix = uuid.uuid4().hex
+            self.request.session["rosetta_file_storage_key_prefix"] = key_prefix
+        self.path = os.path.join(_storage_directory(), "%s.bin" % key_prefix)
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys):
+        data = _map_file(self.path)
+        if data is None:
+            return {}
+        ret = {}
+        try:
+            with memoryview(data) as view:
+                for key in keys:
+                    val = _read_value(data, view, key, _MISSING)
+                    if val is not _MISSING:
+                        ret[key] = val
+        finally:
+            data.close()
+        return ret
+
+    def set(self, key, val):
+        self.set_many({key: val})
+
+    def has(self, key):
+        data = _map_file(self.path)
+        if data is None:
+            return False
+        try:
+            return _find_record(data, _key_digest(key)) is not None
+        finally:
+            data.close()
+
+    def delete(self, key):
+        self.delete_many([key])
+
+    def set_many(self, mapping):
+        self._update(
+            {_key_digest(key): _encode_value(val) for key, val in mapping.items()}
+        )
+
+    def delete_many(self, keys):
+        self._update({_key_digest(key): None for key in keys})
+
+    def _overlay_keys_key(self, po_path):
+        return "po-overlay-keys-%s" % po_path
+
+    def _overlay_entry_key(self, po_path, key):
+        return "po-overlay-entry-%s-%s" % (po_path, key)
+
+    def get_overlay(self, po_path, language_code):
+        data = _map_file(self.path)
+        if data is None:
+            return {}
+        overlay = {}
+        try:
+            with memoryview(data) as view:
+                keys = _read_value(data, view, self._overlay_keys_key(po_path), [])
+                for key in keys:
+                    item = _read_value(
+                        data, view, self._overlay_entry_key(po_path, key)
+                    )
+                    if item is not None:
+                        overlay[key] = item
+        finally:
+            data.close()
+        return overlay
+
+    def set_overlay(self, po_path, language_code, overlay, changed_keys):
+        # Only the changed entries are written, the others are copied as they are
+        changes = {
+            _key_digest(self._overlay_entry_key(po_path, key)): (
+                _encode_json(overlay[key]) if key in overlay else None
+            )
+            for key in changed_keys
+        }
+        changes[_key_digest(self._overlay_keys_key(po_path))] = (
+            _encode_json(sorted(overlay)) if overlay else None
+        )
+        self._update(changes)
+
+    def _update(self, changes):
+        # The file is read and written again with the changes, under a lock so
+        # that concurrent changes aren't lost
+        with _file_lock(self.path + ".lock"):
+            records = {}
+            data = _map_file(self.path)
+            if data is not None:
+                try:
+                    for digest, offset, length in _index_entries(data):
+                        end = offset + length
+                        records[digest] = data[offset:end]
+                finally:
+                    data.close()
+            for digest, record in changes.items():
+                if record is None:
+                    records.pop(digest, None)
+                else:
+                    records[digest] = record
+            self._write(records)
+
+    def _write(self, records):
+        digests = sorted(records)
+        offset = FILE_HEADER.size + len(digests) * FILE_INDEX_ENTRY.size
+        contents = [FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, len(digests))]
+        for digest in digests:
+            contents.append(FILE_INDEX_ENTRY.pack(digest, offset, len(records[digest])))
+            offset += len(records[digest])
+        contents.extend(records[digest] for digest in digests)
+
+        dirname, basename = os.path.split(self.path)
+        fd, tmppath = tempfile.mkstemp(dir=dirname, prefix=".%s." % basename)
+        try:
+            with os.fdopen(fd, "wb") as fhandle:
+                fhandle.writelines(contents)
+            os.replace(tmppath, self.path)
+        except BaseException:
+            os.remove(tmppath)
+            raise
+
+
+class RequestRosettaStorage(BaseRosettaStorage):
+    """Wraps the storage of a request for as long as it lasts: each value is
+    read from the storage at most once, and the writes are buffered until
+    ``flush()`` is called (at the end of the request), so that they're sent to
+    the storage at once. The storage itself is only created when first needed.
+    """
+
+    def __init__(self, request):
+        super(RequestRosettaStorage, self).__init__(request)
+        self._storage = None
+        # The values read or written, _MISSING for the missing ones
+        self._values = {}
+        self._changed = set()
+        self._deleted = set()
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            self._storage = get_storage(self.request)
+        return self._storage
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys):
+        unknown = [key for key in keys if key not in self._values]
+        if unknown:
+            vals = self.storage.get_many(unknown)
+            for key in unknown:
+                self._values[key] = vals.get(key, _MISSING)
+        return {
+            key: self._values[key] for key in keys if self._values[key] is not _MISSING
+        }
+
+    def set(self, key, val):
+        self._values[key] = val
+        self._changed.add(key)
+        self._deleted.discard(key)
+
+    def has(self, key):
+        return key in self.get_many([key])
+
+    # Storages that keep overlays their own way are used directly, the others
+    # through the buffered get() and set()
+    @property
+    def _stores_overlays(self):
+        return type(self.storage).get_overlay is not BaseRosettaStorage.get_overlay
+
+    def get_overlay(self, po_path, language_code):
+        if self._stores_overlays:
+            return self.storage.get_overlay(po_path, language_code)
+        return super(RequestRosettaStorage, self).get_overlay(po_path, language_code)
+
+    def set_overlay(self, po_path, language_code, overlay, changed_keys):
+        if self._stores_overlays:
+            self.storage.set_overlay(po_path, language_code, overlay, changed_keys)
+        else:
+            super(RequestRosettaStorage, self).set_overlay(
+                po_path, language_code, overlay, changed_keys
+            )
+
+    def delete(self, key):
+        self._values[key] = _MISSING
+        self._changed.discard(key)
+        self._deleted.add(key)
+
+    def flush(self):
+        """Send the buffered writes to the storage."""
+        if self._changed:
+            self.storage.set_many({key: self._values[key] for key in self._changed})
+        if self._deleted:
+            self.storage.delete_many(list(self._deleted))
+        self._changed, self._deleted = set(), set()
+
 
 def get_storage(request):
     from rosetta.conf import settings
@@ -131,3 +613,19 @@ def get_storage(request):
     storage_module, storage_class = settings.STORAGE_CLASS.rsplit(".", 1)
     storage_module = importlib.import_module(storage_module)
     return getattr(storage_module, storage_class)(request)
+
+
+def get_request_storage(request):
+    """Return the ``RequestRosettaStorage`` of the given request. The writes
+    made to it are sent to the storage by ``flush_request_storage()``.
+    """
+    storage = getattr(request, "_rosetta_storage", None)
+    if storage is None:
+        storage = request._rosetta_storage = RequestRosettaStorage(request)
+    return storage
+
+
+def flush_request_storage(request):
+    storage = getattr(request, "_rosetta_storage", None)
+    if storage is not None:
+        storage.flush()
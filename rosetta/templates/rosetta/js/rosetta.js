@@ -10,16 +10,24 @@ $(document).ready(function() {
 
 {% if rosetta_settings.ENABLE_TRANSLATION_SUGGESTIONS %}
     {% if rosetta_settings.DEEPL_AUTH_KEY or rosetta_settings.AZURE_CLIENT_SECRET or rosetta_settings.GOOGLE_APPLICATION_CREDENTIALS_PATH %}
+    var sourceLang = '{{ rosetta_settings.MESSAGES_SOURCE_LANGUAGE_CODE }}';
+    var destLang = '{{ rosetta_i18n_lang_code_normalized }}';
+
+    function originalText(a) {
+        var orig = $('.original .message', a.parents('tr')).html();
+        return unescape(orig).replace(/<br\s?\/?>/g,'\n').replace(/<code>/,'').replace(/<\/code>/g,'').replace(/&gt;/g,'>').replace(/&lt;/g,'<');
+    }
+
+    function translatedText(translation) {
+        return unescape(translation).replace(/&#39;/g,'\'').replace(/&quot;/g,'"').replace(/%\s+(\([^\)]+\))\s*s/g,' %$1s ');
+    }
+
     $('a.suggest').click(function(e){
         e.preventDefault();
         var a = $(this);
-        var str = a.html();
-        var orig = $('.original .message', a.parents('tr')).html();
+        var orig = originalText(a);
         var trans=$('textarea',a.parent());
-        var sourceLang = '{{ rosetta_settings.MESSAGES_SOURCE_LANGUAGE_CODE }}';
-        var destLang = '{{ rosetta_i18n_lang_code_normalized }}';
 
-        orig = unescape(orig).replace(/<br\s?\/?>/g,'\n').replace(/<code>/,'').replace(/<\/code>/g,'').replace(/&gt;/g,'>').replace(/&lt;/g,'<');
         a.attr('class','suggesting').html('...');
 
         $.getJSON("{% url 'rosetta.translate_text' %}", {
@@ -29,7 +37,7 @@ $(document).ready(function() {
             },
             function(data) {
                 if (data.success){
-                    trans.val(unescape(data.translation).replace(/&#39;/g,'\'').replace(/&quot;/g,'"').replace(/%\s+(\([^\)]+\))\s*s/g,' %$1s '));
+                    trans.val(translatedText(data.translation));
                     a.hide();
                 } else {
                     a.text(data.error);
@@ -37,6 +45,55 @@ $(document).ready(function() {
             }
         );
     });
+
+    // Suggest translations for all the untranslated messages of the page, in
+    // a single request
+    $('a.suggest-all').click(function(e){
+        e.preventDefault();
+        var all = $(this);
+        var links = $('a.suggest:visible').filter(function() {
+            return !$('textarea', $(this).parent()).val();
+        });
+        if (!links.length) {
+            all.hide();
+            return;
+        }
+        var linkLabel = links.first().html();
+        all.attr('class','suggesting').html('...');
+        links.attr('class','suggesting').html('...');
+
+        function failed(error) {
+            all.attr('class','suggest-all').text(error);
+            links.attr('class','suggest').html(linkLabel);
+        }
+
+        $.ajax({
+            url: "{% url 'rosetta.translate_texts' %}",
+            type: 'POST',
+            contentType: 'application/json',
+            dataType: 'json',
+            headers: {'X-CSRFToken': $('form.results input[name="csrfmiddlewaretoken"]').val()},
+            data: JSON.stringify({
+                from: sourceLang,
+                to: destLang,
+                texts: links.map(function() { return originalText($(this)); }).get()
+            }),
+            success: function(data) {
+                if (data.success) {
+                    links.each(function(i) {
+                        $('textarea', $(this).parent()).val(translatedText(data.translations[i]));
+                        $(this).hide();
+                    });
+                    all.hide();
+                } else {
+                    failed(data.error);
+                }
+            },
+            error: function(xhr) {
+                failed((xhr.responseJSON && xhr.responseJSON.error) || xhr.statusText);
+            }
+        });
+    });
    {% elif rosetta_settings.YANDEX_TRANSLATE_KEY %}
     $('a.suggest').click(function(e){
         e.preventDefault();
@@ -76,6 +133,15 @@ $(document).ready(function() {
             }
         });
     });
+
+    // Click all the suggest links of the untranslated messages of the page
+    $('a.suggest-all').click(function(e){
+        e.preventDefault();
+        $('a.suggest:visible').filter(function() {
+            return !$('textarea', $(this).parent()).val();
+        }).click();
+        $(this).hide();
+    });
    {% endif %}
 {% endif %}
 
@@ -137,4 +203,24 @@ $(document).ready(function() {
         });
     });
 
+    // Only submit the messages that were changed on this page
+    $('form.results').submit(function() {
+        $('tbody tr', this).each(function() {
+            var row = $(this), dirty = false;
+            $('textarea', row).each(function() {
+                dirty = dirty || this.value != this.defaultValue;
+            });
+            $('td.c input[type="checkbox"]', row).each(function() {
+                dirty = dirty || this.checked != this.defaultChecked;
+            });
+            if (!dirty) {
+                $('textarea, td.c input', row).prop('disabled', true);
+            }
+        });
+    });
+    // ... but don't leave them disabled when coming back to this page
+    $(window).on('pageshow', function() {
+        $('form.results :disabled').prop('disabled', false);
+    });
+
 });
@@ -5,6 +5,7 @@ from django.utils.html import escape
 from django.utils.safestring import mark_safe
 
 from rosetta.access import can_translate
+from rosetta.pocache import entry_version
 
 
 register = template.Library()
@@ -85,3 +86,5 @@ def is_fuzzy(message):
 
 
 is_fuzzy = register.filter(is_fuzzy)
+
+entry_version = register.filter(entry_version)
@@ -1,26 +1,83 @@
 import filecmp
 import hashlib
+import math
 import os
+import pickle
+import re
 import shutil
+import tempfile
+import threading
+import zipfile
+from io import BytesIO, StringIO
 from unittest import mock
 from urllib.parse import urlencode
 
 import vcr
+from polib import POEntry, POFile, mofile, pofile
 
 from django import VERSION
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.paginator import Paginator
 from django.dispatch import receiver
 from django.http import Http404
 from django.test import RequestFactory, TestCase, override_settings
 from django.test.client import Client
 from django.urls import resolve, reverse
+from django.utils import translation
 from django.utils.encoding import force_bytes
 
 from rosetta import views
-from rosetta.poutil import find_pos
-from rosetta.signals import entry_changed, post_save
-from rosetta.storage import get_storage
+from rosetta.compiler import CompileWorker, compile_worker
+from rosetta.invalidation import MAX_CHANGES, catalog_changed, check_invalidations
+from rosetta.pocache import (
+    FilterPartitions,
+    POFileCache,
+    SearchIndex,
+    _chunk_keys,
+    dumps_pofile,
+    entries_changed,
+    entry_key,
+    entry_version,
+    filter_positions,
+    filtered_entries,
+    find_entry,
+    get_chunked,
+    load_pofile,
+    loads_pofile,
+    overlay_pofile,
+    own_entry,
+    po_file_cache,
+    save_pofile,
+    search_entries,
+    set_chunked,
+    update_overlay,
+)
+from rosetta.poutil import (
+    POScanner,
+    clear_find_pos_cache,
+    compute_pofile_stats,
+    find_pos,
+    find_pos_many,
+    pofile_stats,
+    scan_pofile_stats,
+)
+from rosetta.reload import reload_language
+from rosetta.signals import (
+    catalog_invalidated,
+    entry_changed,
+    post_save,
+    timings_recorded,
+)
+from rosetta.storage import (
+    _encode_json,
+    cache,
+    flush_request_storage,
+    get_request_storage,
+    get_storage,
+)
+from rosetta.translate_utils import chunk_texts, translate_many
 
 
 class RosettaTestCase(TestCase):
@@ -65,6 +122,13 @@ class RosettaTestCase(TestCase):
         src_path = os.path.normpath(os.path.join(self.curdir, template_path))
         shutil.copy(src_path, self.dest_file)
 
+    def version_token(self, response, md5hash):
+        """Return the version token of an entry, as rendered in the form."""
+        match = re.search(
+            r'name="v_%s" value="([0-9a-f]+)"' % md5hash, response.content.decode()
+        )
+        return match.group(1)
+
     @property
     def xx_form_url(self):
         kwargs = {"po_filter": "third-party", "lang_id": "xx", "idx": 0}
@@ -230,13 +294,23 @@ class RosettaTestCase(TestCase):
         self.assertContains(r, "m_e48f149a8b2e8baa81b816c0edf93890")
 
         # client 2 posts!
-        data = {"m_e48f149a8b2e8baa81b816c0edf93890": "Hello, world, from client two!"}
+        data = {
+            "m_e48f149a8b2e8baa81b816c0edf93890": "Hello, world, from client two!",
+            "v_e48f149a8b2e8baa81b816c0edf93890": self.version_token(
+                r2, "e48f149a8b2e8baa81b816c0edf93890"
+            ),
+        }
         r2 = self.client2.post(untranslated_url, data, follow=True)
 
         self.assertNotContains(r2, "save-conflict")
 
         # uh-oh here comes client 1
-        data = {"m_e48f149a8b2e8baa81b816c0edf93890": "Hello, world, from client one!"}
+        data = {
+            "m_e48f149a8b2e8baa81b816c0edf93890": "Hello, world, from client one!",
+            "v_e48f149a8b2e8baa81b816c0edf93890": self.version_token(
+                r, "e48f149a8b2e8baa81b816c0edf93890"
+            ),
+        }
         r = self.client.post(untranslated_url, data, follow=True)
         # An error message is displayed
         self.assertContains(r, "save-conflict")
@@ -458,7 +532,8 @@ class RosettaTestCase(TestCase):
 
         r = self.client.get(self.xx_form_url + "?filter=translated")
         self.assertTrue("Testing cookie length" in r.content.decode())
-        self.assertTrue("m_9f6c442c6d579707440ba9dada0fb373" in r.content.decode())
+        # translating an entry doesn't change its key
+        self.assertTrue("m_9efd113f7919952523f06e0d88da9c54" in r.content.decode())
 
     @override_settings(ROSETTA_STORAGE_CLASS="rosetta.storage.CacheRosettaStorage")
     def test_21_concurrency_of_cache_backend(self):
@@ -482,7 +557,7 @@ class RosettaTestCase(TestCase):
 
         r = self.client.get(self.xx_form_url)
         # We have distinct hashes, even though the msgid and msgstr are identical
-        self.assertTrue("m_4765f7de94996d3de5975fa797c3451f" in r.content.decode())
+        self.assertTrue("m_01f6fbb3fe066f1b0f1de784d4157415" in r.content.decode())
         self.assertTrue("m_08e4e11e2243d764fc45a5a4fba5d0f2" in r.content.decode())
 
     @override_settings(ROSETTA_LANGUAGES=(("xx", "dummy language"),))
@@ -562,7 +637,7 @@ class RosettaTestCase(TestCase):
         )
         r = self.client.get(url)
         self.assertTrue("French (France), UTF8" in r.content.decode())
-        self.assertTrue("m_03a603523bd75b00414a413657acdeb2" in r.content.decode())
+        self.assertTrue("m_71a6479faf8712e37dd5755cd1d11804" in r.content.decode())
 
     def test_28_issue_gh87(self):
         """Make sure that rosetta_i18n_catalog_filter is passed into the context."""
@@ -705,16 +780,17 @@ class RosettaTestCase(TestCase):
         tmpl_path = os.path.normpath(os.path.join(self.curdir, "django.po.template"))
         self.assertTrue(filecmp.cmp(tmpl_path, self.dest_file))
 
-        # Confirm that the cached version has been updated
-        cache_key = "po-file-%s" % self.dest_file
+        # Confirm that the change has been stored
+        cache_key = "po-overlay-%s" % self.dest_file
         request = RequestFactory().get(self.xx_form_url)
         request.user = self.user
         request.session = self.client.session
         storage = get_storage(request)
 
-        po_file = storage.get(cache_key)
-        entry = po_file.find("String 2")
-        self.assertEqual(entry.msgstr, "Hello, world")
+        overlay = storage.get(cache_key)
+        self.assertEqual(
+            overlay["e48f149a8b2e8baa81b816c0edf93890"], ["Hello, world", [], False]
+        )
 
         # cleanup
         os.chmod(self.dest_file, 420)  # 0644
@@ -1050,6 +1126,1172 @@ class RosettaTestCase(TestCase):
             self.assertTrue("foo language" in r.content.decode())
             self.assertTrue("bar language" in r.content.decode())
 
+    def test_52_find_pos_cache(self):
+        clear_find_pos_cache()
+        po_paths = find_pos("xx", third_party_apps=True)
+        self.assertIn(self.dest_file, po_paths)
+
+        # Catalogs aren't looked up again while nothing changed on disk
+        with mock.patch("rosetta.poutil.os.path.isfile") as isfile_mock:
+            self.assertEqual(find_pos("xx", third_party_apps=True), po_paths)
+            isfile_mock.assert_not_called()
+
+        # A new catalog in one of the scanned directories is picked up
+        new_po = os.path.join(os.path.dirname(self.dest_file), "djangojs.po")
+        shutil.copy(self.dest_file, new_po)
+        try:
+            self.assertIn(new_po, find_pos("xx", third_party_apps=True))
+        finally:
+            os.remove(new_po)
+        self.assertNotIn(new_po, find_pos("xx", third_party_apps=True))
+
+        # Changing the settings invalidates the cache
+        with self.settings(ROSETTA_EXCLUDED_APPLICATIONS=("rosetta",)):
+            self.assertNotIn(self.dest_file, find_pos("xx", third_party_apps=True))
+        self.assertIn(self.dest_file, find_pos("xx", third_party_apps=True))
+
+    def test_53_find_pos_many(self):
+        langs = ["xx", "fr", "fr_FR.utf8", "zh_Hans", "bs-Cyrl-BA", "yy"]
+        clear_find_pos_cache()
+        with mock.patch("rosetta.poutil.os.scandir", wraps=os.scandir) as scandir_mock:
+            po_paths = find_pos_many(langs, third_party_apps=True)
+        scanned = [c.args[0] for c in scandir_mock.call_args_list]
+        # each directory is only listed once, whatever the number of languages
+        self.assertEqual(len(scanned), len(set(scanned)))
+
+        self.assertEqual(list(po_paths), langs)
+        for lang in langs:
+            self.assertEqual(po_paths[lang], find_pos(lang, third_party_apps=True))
+        self.assertIn(self.dest_file, po_paths["xx"])
+        self.assertIn(
+            os.path.join(settings.LOCALE_PATHS[0], "yy", "LC_MESSAGES", "django.po"),
+            po_paths["yy"],
+        )
+
+    def test_54_pofile_stats_cache(self):
+        self.copy_po_file_from_template("./django.po.issue79.template")
+        stats = pofile_stats(self.dest_file)
+        self.assertEqual(
+            stats,
+            {
+                "translated": 0,
+                "untranslated": 1,
+                "fuzzy": 0,
+                "obsolete": 1,
+                "messages": 1,
+                "percent_translated": 0,
+            },
+        )
+
+        # Unchanged catalogs aren't parsed again
+        self.client.get(self.third_party_file_list_url)
+        with mock.patch("rosetta.poutil.scan_pofile_stats") as scan_mock:
+            self.assertEqual(pofile_stats(self.dest_file), stats)
+            r = self.client.get(self.third_party_file_list_url)
+            scan_mock.assert_not_called()
+        self.assertContains(r, '<td class="ch-obsolete r">1</td>')
+
+        self.copy_po_file_from_template("./django.po.template")
+        self.assertEqual(
+            pofile_stats(self.dest_file),
+            {
+                "translated": 0,
+                "untranslated": 4,
+                "fuzzy": 0,
+                "obsolete": 0,
+                "messages": 4,
+                "percent_translated": 0,
+            },
+        )
+
+    def test_55_po_scanner(self):
+        templates = [
+            fn for fn in os.listdir(self.curdir) if fn.endswith(".po.template")
+        ]
+        self.assertTrue(templates)
+        for fn in templates + [self.dest_file]:
+            path = os.path.join(self.curdir, fn)
+            po_file = pofile(path)
+            scanner = POScanner(path)
+            entries = list(scanner)
+
+            self.assertEqual(len(entries), len(po_file))
+            self.assertEqual(scanner.metadata, po_file.metadata)
+            for scanned, entry in zip(entries, po_file):
+                self.assertEqual(scanned.translated, entry.translated())
+                self.assertEqual(scanned.fuzzy, entry.fuzzy)
+                self.assertEqual(scanned.obsolete, entry.obsolete)
+                self.assertEqual(scanned.plural, bool(entry.msgid_plural))
+            self.assertEqual(scan_pofile_stats(path), compute_pofile_stats(po_file))
+
+    @override_settings(ROSETTA_LANGUAGES=(("xx", "dummy language"),))
+    def test_56_pofile_cache(self):
+        self.copy_po_file_from_template("./django.po.template")
+        po_file_cache.clear()
+        untranslated_url = self.xx_form_url + "?msg_filter=untranslated"
+        self.client.get(untranslated_url)
+        self.assertEqual(len(po_file_cache), 1)
+
+        # Neither the next page load, nor the save and redirect cycle parse
+        # the catalog again
+        with mock.patch("rosetta.pocache.pofile") as pofile_mock:
+            r = self.client.get(untranslated_url)
+            self.assertContains(r, "m_e48f149a8b2e8baa81b816c0edf93890")
+            data = {"m_e48f149a8b2e8baa81b816c0edf93890": "Hello, world"}
+            r = self.client.post(untranslated_url, data, follow=True)
+            self.assertNotContains(r, "String 2")
+            pofile_mock.assert_not_called()
+        with open(self.dest_file, "r") as po_file:
+            self.assertIn("Hello, world", po_file.read())
+
+        # Changes made by someone else are picked up
+        self.copy_po_file_from_template("./django.po.template")
+        r = self.client.get(untranslated_url)
+        self.assertContains(r, "String 2")
+
+    def test_57_pofile_cache_limits(self):
+        cache = POFileCache()
+        paths = [
+            os.path.join(self.curdir, fn)
+            for fn in ("django.po.template", "django.po.issue60.template")
+        ]
+        size = os.path.getsize(paths[0]) + os.path.getsize(paths[1])
+        with self.settings(ROSETTA_POFILE_CACHE_MAX_ENTRIES=1):
+            po_file = cache.get(paths[0], 78)
+            self.assertIs(cache.get(paths[0], 78), po_file)
+            cache.get(paths[1], 78)
+            self.assertEqual(len(cache), 1)
+            self.assertIsNot(cache.get(paths[0], 78), po_file)
+
+        cache.clear()
+        with self.settings(ROSETTA_POFILE_CACHE_MAX_BYTES=size - 1):
+            cache.get(paths[0], 78)
+            cache.get(paths[1], 78)
+            self.assertEqual(len(cache), 1)
+
+        with self.settings(ROSETTA_POFILE_CACHE_MAX_ENTRIES=0):
+            cache.clear()
+            cache.get(paths[0], 78)
+            self.assertEqual(len(cache), 0)
+
+    @override_settings(ROSETTA_LANGUAGES=(("xx", "dummy language"),))
+    def test_58_find_entry_index(self):
+        self.copy_po_file_from_template("./django.po.issue39gh.template")
+        po_file = load_pofile(self.dest_file)
+        for entry in po_file:
+            self.assertIs(
+                find_entry(po_file, entry_key(entry)),
+                po_file.find(entry.md5hash, "md5hash"),
+            )
+        self.assertIsNone(find_entry(po_file, "0" * 32))
+
+        # Saving a page doesn't scan the catalog for each submitted message
+        self.client.get(self.xx_form_url)
+        with mock.patch.object(POFile, "find") as find_mock:
+            data = {"m_01f6fbb3fe066f1b0f1de784d4157415": "Hello, world"}
+            self.client.post(self.xx_form_url, data)
+            find_mock.assert_not_called()
+        with open(self.dest_file, "r") as po_file:
+            self.assertIn("Hello, world", po_file.read())
+
+    @override_settings(ROSETTA_LANGUAGES=(("xx", "dummy language"),))
+    def test_59_stable_entry_keys(self):
+        self.copy_po_file_from_template("./django.po.issue39gh.template")
+        po_file = load_pofile(self.dest_file)
+        entry = po_file[0]
+        key, version = entry_key(entry), entry_version(entry)
+
+        # Translating an entry doesn't change its key, but changes its version
+        entry.msgstr = "Hello, world"
+        self.assertEqual(entry_key(entry), key)
+        self.assertNotEqual(entry_version(entry), version)
+        version = entry_version(entry)
+        entry.flags.append("fuzzy")
+        self.assertNotEqual(entry_version(entry), version)
+
+        # Entries are only hashed when needed
+        po_file = load_pofile(self.dest_file)
+        self.assertFalse(any(hasattr(e, "md5hash") for e in po_file))
+
+        # Concurrent edits of different entries don't conflict, even when
+        # the catalog changed in between
+        r = self.client.get(self.xx_form_url)
+        r2 = self.client2.get(self.xx_form_url)
+        keys = re.findall(r'name="m_([0-9a-f]+)"', r.content.decode())
+        self.assertEqual(len(keys), 2)
+        for client, response, key in (
+            (self.client, r, keys[0]),
+            (self.client2, r2, keys[1]),
+        ):
+            data = {
+                "m_%s" % key: "Translated %s" % key,
+                "v_%s" % key: self.version_token(response, key),
+            }
+            r = client.post(self.xx_form_url, data, follow=True)
+            self.assertNotContains(r, "save-conflict")
+        with open(self.dest_file, "r") as po_file:
+            content = po_file.read()
+        for key in keys:
+            self.assertIn("Translated %s" % key, content)
+
+    def test_60_search_index(self):
+        po_file = load_pofile(os.path.join(self.curdir, "django.po.test44.template"))
+
+        def naive_search(query):
+            query = query.casefold()
+            return [
+                e
+                for e in po_file
+                if not e.obsolete
+                and any(
+                    query in str(field).casefold()
+                    for field in (
+                        e.msgstr,
+                        e.msgid,
+                        e.msgctxt or "",
+                        e.comment,
+                        "".join(o[0] for o in e.occurrences),
+                        e.msgid_plural,
+                        "".join(e.msgstr_plural.values()),
+                    )
+                )
+            ]
+
+        for query in ("lorem", "IPSUM", "or", "m", "tempor.html", "xyz", "Лорем"):
+            self.assertEqual(list(search_entries(po_file, query)), naive_search(query))
+
+        # The index follows the changes made to the entries
+        entry = search_entries(po_file, "lorem")[0]
+        entry.msgstr = "Quisque vel"
+        entries_changed(po_file, [entry])
+        self.assertEqual(list(search_entries(po_file, "quisque")), [entry])
+        self.assertEqual(list(search_entries(po_file, "dolor sit")), [])
+
+    def test_61_filter_partitions(self):
+        po_file = load_pofile(os.path.join(self.curdir, "django.po.template"))
+
+        def check():
+            expected = {
+                "untranslated": po_file.untranslated_entries(),
+                "translated": po_file.translated_entries(),
+                "fuzzy": [e for e in po_file.fuzzy_entries() if not e.obsolete],
+                "all": [e for e in po_file if not e.obsolete],
+            }
+            for msg_filter, entries in expected.items():
+                self.assertEqual(
+                    [po_file[p] for p in filter_positions(po_file, msg_filter)],
+                    entries,
+                )
+
+        check()
+        self.assertTrue(filter_positions(po_file, "untranslated"))
+
+        # The partitions follow the changes made to the entries
+        entry = po_file.untranslated_entries()[0]
+        entry.msgstr = "Translated"
+        entries_changed(po_file, [entry])
+        check()
+        entry.flags.append("fuzzy")
+        entries_changed(po_file, [entry])
+        check()
+        entry.flags.remove("fuzzy")
+        entry.msgstr = ""
+        entries_changed(po_file, [entry])
+        check()
+
+    def test_62_lazy_pagination(self):
+        po_file = load_pofile(os.path.join(self.curdir, "django.po.test44.template"))
+        entries = filtered_entries(po_file, "all")
+        expected = [e for e in po_file if not e.obsolete]
+        self.assertEqual(len(entries), len(expected))
+        self.assertEqual(entries[3], expected[3])
+        self.assertEqual(entries[-1], expected[-1])
+        self.assertEqual(list(entries), expected)
+
+        # Only the entries of the requested page are looked up
+        paginator = Paginator(entries, 10)
+        with mock.patch.object(
+            POFile, "__getitem__", side_effect=po_file.__getitem__
+        ) as getitem_mock:
+            page = paginator.page(paginator.num_pages)
+        start = page.start_index() - 1
+        self.assertEqual(page.object_list, expected[start:])
+        self.assertEqual(getitem_mock.call_count, len(page))
+
+        # Search results are sequences of entries, too
+        results = search_entries(po_file, "lorem")
+        self.assertEqual(results[:2], list(results)[:2])
+
+    def test_63_incremental_save(self):
+        self.copy_po_file_from_template("./django.po.test44.template")
+        with open(self.dest_file, "rb") as f_:
+            original = f_.read()
+        mode = os.stat(self.dest_file).st_mode
+        po_file = load_pofile(self.dest_file)
+        entries = [e for e in po_file if not e.obsolete]
+        first, last = entries[1], entries[-1]
+        first.msgstr = "Première"
+        last.msgstr = "Dernière\nsur deux lignes"
+        po_file.metadata["Last-Translator"] = "Rosetta <rosetta@example.com>"
+
+        # Only the header and the changed entries are rewritten
+        with mock.patch.object(POFile, "save") as save_mock:
+            save_pofile(po_file, [first, last])
+            save_pofile(po_file, [first])
+        save_mock.assert_not_called()
+        with open(self.dest_file, "rb") as f_:
+            contents = f_.read()
+        self.assertNotEqual(contents, original)
+        self.assertEqual(str(pofile(self.dest_file)), str(po_file))
+        self.assertEqual(os.stat(self.dest_file).st_mode, mode)
+
+        # The whole catalog is saved if the file changed in between
+        with open(self.dest_file, "ab") as f_:
+            f_.write(b"\n")
+        with mock.patch.object(POFile, "save", autospec=True) as save_mock:
+            save_pofile(po_file, [first])
+        save_mock.assert_called_once_with(po_file)
+
+    def test_64_background_compile(self):
+        self.copy_po_file_from_template("./django.po.template")
+        mo_file = self.dest_file[:-3] + ".mo"
+        r = self.client.get(self.xx_form_url)
+        self.assertFalse(r.context["compile_status"])
+        msg_hashes = {m.msgid: m.md5hash for m in r.context["rosetta_messages"]}
+
+        with self.settings(ROSETTA_AUTO_COMPILE_IN_BACKGROUND=True):
+            with mock.patch.object(
+                views.TranslationFormView, "reload_processes"
+            ) as reload_mock:
+                self.client.post(
+                    self.xx_form_url, {"m_" + msg_hashes["String 1"]: "Chaîne 1"}
+                )
+                compile_worker.wait()
+            reload_mock.assert_called_once_with()
+            self.assertEqual(mofile(mo_file).find("String 1").msgstr, "Chaîne 1")
+            r = self.client.get(self.xx_form_url)
+            self.assertEqual(r.context["compile_status"]["status"], "compiled")
+            self.assertIsNotNone(r.context["compile_status"]["last_compiled"])
+
+    def test_65_compile_coalescing(self):
+        worker = CompileWorker()
+        started, release = threading.Event(), threading.Event()
+        compiled = []
+
+        def compile_catalog(path):
+            started.set()
+            release.wait(5)
+            compiled.append(path)
+            return True
+
+        with mock.patch("rosetta.compiler.compile_catalog", compile_catalog):
+            self.assertTrue(worker.schedule(self.dest_file))
+            started.wait(5)
+            # While the catalog is being compiled, the next saves are compiled
+            # together afterwards
+            on_compiled = mock.Mock()
+            self.assertTrue(worker.schedule(self.dest_file))
+            self.assertFalse(worker.schedule(self.dest_file))
+            self.assertFalse(worker.schedule(self.dest_file, on_compiled=on_compiled))
+            release.set()
+            worker.wait(5)
+        self.assertEqual(compiled, [self.dest_file, self.dest_file])
+        on_compiled.assert_called_once_with()
+
+        # The errors of the background compilations are logged
+        logged = threading.Event()
+        on_compiled = mock.Mock(side_effect=RuntimeError("Failed"))
+        with mock.patch(
+            "rosetta.compiler.compile_catalog", return_value=True
+        ), mock.patch(
+            "rosetta.compiler.logger.error", side_effect=lambda *a, **k: logged.set()
+        ) as error_mock:
+            worker.schedule(self.dest_file, on_compiled=on_compiled)
+            self.assertTrue(logged.wait(5))
+        self.assertIsInstance(error_mock.call_args[1]["exc_info"], RuntimeError)
+
+    def test_66_compile_command(self):
+        self.copy_po_file_from_template("./django.po.template")
+        mo_file = self.dest_file[:-3] + ".mo"
+        if not os.path.exists(mo_file):
+            pofile(self.dest_file).save_as_mofile(mo_file)
+        os.utime(mo_file, ns=(0, 0))
+
+        command = "rosetta.management.commands.rosetta_compile.compile_catalog"
+        with mock.patch(command, return_value=True) as compile_mock:
+            call_command("rosetta_compile", stdout=StringIO())
+        compiled = [c[0][0] for c in compile_mock.call_args_list]
+        self.assertIn(os.path.realpath(self.dest_file), compiled)
+
+        # Up to date catalogs aren't compiled again
+        os.utime(mo_file)
+        with mock.patch(command, return_value=True) as compile_mock:
+            call_command("rosetta_compile", stdout=StringIO())
+        compiled = [c[0][0] for c in compile_mock.call_args_list]
+        self.assertNotIn(os.path.realpath(self.dest_file), compiled)
+
+    def test_67_unchanged_entries_are_not_saved(self):
+        self.copy_po_file_from_template("./django.po.issue60.template")
+        r = self.client.get(self.xx_form_url)
+        data = {}
+        for message in r.context["rosetta_messages"]:
+            if message.msgid_plural:
+                for k, msgstr in message.msgstr_plural.items():
+                    data["m_%s_%s" % (message.md5hash, k)] = msgstr
+            else:
+                data["m_%s" % message.md5hash] = message.msgstr
+            if message.fuzzy:
+                data["f_%s" % message.md5hash] = "1"
+        with open(self.dest_file, "rb") as f_:
+            original = f_.read()
+
+        saved = mock.Mock()
+        post_save.connect(saved)
+        changed = mock.Mock()
+        entry_changed.connect(changed)
+        try:
+            # Submitting a page as it was doesn't save anything
+            r = self.client.post(self.xx_form_url, data)
+            self.assertEqual(r.status_code, 302)
+            with open(self.dest_file, "rb") as f_:
+                self.assertEqual(f_.read(), original)
+            saved.assert_not_called()
+            changed.assert_not_called()
+
+            # Only changed entries are
+            key = next(k for k in data if k.startswith("m_"))
+            data[key] += " (changed)"
+            self.client.post(self.xx_form_url, data)
+            self.assertEqual(saved.call_count, 1)
+            self.assertEqual(changed.call_count, 1)
+        finally:
+            post_save.disconnect(saved)
+            entry_changed.disconnect(changed)
+
+    def test_68_gettext_auto_reload(self):
+        self.copy_po_file_from_template("./django.po.template")
+
+        def translate(msgid):
+            with translation.override("xx"):
+                return translation.gettext(msgid)
+
+        def save(msgstr):
+            r = self.client.get(self.xx_form_url)
+            msg_hashes = {m.msgid: m.md5hash for m in r.context["rosetta_messages"]}
+            self.client.post(self.xx_form_url, {"m_" + msg_hashes["String 1"]: msgstr})
+
+        save("Translation 1")
+        reload_language("xx")
+        self.assertEqual(translate("String 1"), "Translation 1")
+
+        # The translations that were loaded are kept by default
+        save("Translation 2")
+        self.assertEqual(translate("String 1"), "Translation 1")
+
+        with self.settings(ROSETTA_GETTEXT_AUTO_RELOAD=True):
+            save("Translation 3")
+            self.assertEqual(translate("String 1"), "Translation 3")
+
+    def test_69_invalidation(self):
+        received = []
+
+        def receiver(sender, po_path, language_code, **kwargs):
+            received.append((po_path, language_code))
+
+        catalog_invalidated.connect(receiver)
+        try:
+            check_invalidations()
+
+            # Changes made by this process are ignored...
+            catalog_changed(self.dest_file, "xx")
+            check_invalidations()
+            self.assertEqual(received, [])
+
+            # ... the ones of the other processes are applied, once per process,
+            # by the middleware
+            with mock.patch("rosetta.invalidation._origin", "other"):
+                catalog_changed(self.dest_file, "xx")
+            with mock.patch.object(po_file_cache, "discard") as discard_mock:
+                self.client.get(self.project_file_list_url)
+                self.client.get(self.project_file_list_url)
+            discard_mock.assert_called_once_with(self.dest_file)
+            self.assertEqual(received, [(self.dest_file, "xx")])
+
+            # Everything is dropped when too many changes were missed
+            received = []
+            with mock.patch("rosetta.invalidation._origin", "other"):
+                for i in range(MAX_CHANGES + 1):
+                    catalog_changed(self.dest_file, "xx")
+            check_invalidations()
+            self.assertEqual(received, [(None, None)])
+        finally:
+            catalog_invalidated.disconnect(receiver)
+
+    def test_70_bulk_update(self):
+        self.copy_po_file_from_template("./django.po.issue34gh.template")
+        kwargs = {"po_filter": "third-party", "lang_id": "xx", "idx": 0}
+        url = reverse("rosetta-bulk-update", kwargs=kwargs)
+        po_file = pofile(self.dest_file)
+        singular = next(e for e in po_file if e.msgid and not e.msgid_plural)
+        plural = next(e for e in po_file if e.msgid_plural)
+
+        saved = mock.Mock()
+        post_save.connect(saved)
+        changed = mock.Mock()
+        entry_changed.connect(changed)
+        try:
+            r = self.client.post(
+                url,
+                {
+                    "entries": [
+                        {"key": entry_key(singular), "msgstr": "Un", "fuzzy": True},
+                        {
+                            "key": entry_key(plural),
+                            "msgstr_plural": {
+                                "0": "\n %s client",
+                                "1": "\n %s clients",
+                            },
+                        },
+                        {"key": entry_key(plural), "msgstr_plural": {"7": "Nope"}},
+                        {"key": "0" * 32, "msgstr": "Nope"},
+                        {"key": entry_key(singular), "msgstr": "Deux", "version": "0"},
+                    ]
+                },
+                content_type="application/json",
+            )
+        finally:
+            post_save.disconnect(saved)
+            entry_changed.disconnect(changed)
+
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json()["changed"], 2)
+        self.assertEqual(
+            [result["status"] for result in r.json()["results"]],
+            ["changed", "changed", "invalid", "not_found", "conflict"],
+        )
+        # One save for the whole batch
+        self.assertEqual(saved.call_count, 1)
+        self.assertEqual(changed.call_count, 2)
+
+        po_file = pofile(self.dest_file)
+        self.assertEqual(po_file.find(singular.msgid).msgstr.strip(), "Un")
+        self.assertTrue(po_file.find(singular.msgid).fuzzy)
+        self.assertEqual(po_file.find(plural.msgid).msgstr_plural[1], "\n %s clients\n")
+        self.assertEqual(
+            r.json()["results"][0]["version"],
+            entry_version(po_file.find(singular.msgid)),
+        )
+
+        # Malformed batches are rejected
+        r = self.client.post(url, "[]", content_type="application/json")
+        self.assertEqual(r.status_code, 400)
+
+        # Same access control as the translation form
+        with self.settings(ROSETTA_LANGUAGES=(("fr", "French"),)):
+            r = self.client.post(url, {"entries": []}, content_type="application/json")
+        self.assertEqual(r.status_code, 404)
+
+    def test_71_bulk_actions(self):
+        self.copy_po_file_from_template("./django.po.test44.template")
+        untranslated = pofile(self.dest_file).untranslated_entries()
+        self.assertTrue(len(untranslated) > 10)
+
+        saved = mock.Mock()
+        post_save.connect(saved)
+        try:
+            r = self.client.post(
+                self.xx_form_url + "?msg_filter=untranslated",
+                {"bulk_action": "copy_msgid"},
+                follow=True,
+            )
+        finally:
+            post_save.disconnect(saved)
+        # All the untranslated messages are changed at once, not only the
+        # ones of the first page
+        self.assertEqual(saved.call_count, 1)
+        self.assertContains(r, "%d messages were changed." % len(untranslated))
+        po_file = pofile(self.dest_file)
+        self.assertEqual(po_file.untranslated_entries(), [])
+        msgid = untranslated[0].msgid
+        self.assertEqual(po_file.find(msgid).msgstr, msgid)
+
+        # Bulk actions apply to search results too
+        matching = len(search_entries(po_file, "String 1"))
+        self.assertTrue(0 < matching < len(po_file))
+        r = self.client.post(
+            self.xx_form_url + "?query=String 1",
+            {"bulk_action": "mark_fuzzy"},
+            follow=True,
+        )
+        self.assertContains(r, "%d messages were changed." % matching)
+        self.assertEqual(len(pofile(self.dest_file).fuzzy_entries()), matching)
+
+        r = self.client.post(
+            self.xx_form_url + "?msg_filter=fuzzy",
+            {"bulk_action": "clear_fuzzy"},
+        )
+        self.assertEqual(pofile(self.dest_file).fuzzy_entries(), [])
+
+        r = self.client.post(self.xx_form_url, {"bulk_action": "nope"})
+        self.assertEqual(r.status_code, 404)
+
+    def test_72_server_timing(self):
+        self.copy_po_file_from_template("./django.po.template")
+        r = self.client.get(self.xx_form_url)
+        self.assertNotIn("Server-Timing", r)
+
+        received = mock.Mock()
+        timings_recorded.connect(received)
+        try:
+            with self.settings(ROSETTA_SERVER_TIMING=True):
+                r = self.client.get(self.xx_form_url)
+        finally:
+            timings_recorded.disconnect(received)
+        phases = [p.split(";")[0] for p in r["Server-Timing"].split(", ")]
+        for phase in ("find-pos", "entries", "render", "total"):
+            self.assertIn(phase, phases)
+        self.assertEqual(received.call_count, 1)
+        kwargs = received.call_args[1]
+        self.assertEqual(kwargs["po_path"], os.path.realpath(self.dest_file))
+        self.assertEqual(kwargs["entry_count"], 4)
+        self.assertEqual(list(kwargs["timings"]), phases)
+
+    def test_73_chunked_catalogs(self):
+        po_file = load_pofile(os.path.join(self.curdir, "django.po.test44.template"))
+        entry_key(po_file[0])
+
+        # Catalogs serialize to a compact format
+        data = dumps_pofile(po_file)
+        self.assertTrue(len(data) < len(pickle.dumps(po_file)) / 2)
+        loaded = loads_pofile(data)
+        self.assertEqual(str(loaded), str(po_file))
+        self.assertEqual(loaded.metadata, po_file.metadata)
+        self.assertEqual(loaded.fpath, po_file.fpath)
+        self.assertEqual(loaded[0].md5hash, po_file[0].md5hash)
+
+        # ... which is stored in chunks in the cache
+        key = "rosetta-test-catalog"
+        with mock.patch("rosetta.pocache.CHUNK_SIZE", 100):
+            set_chunked(key, data, 60)
+        manifest = cache.get(key)
+        self.assertEqual(manifest[2], math.ceil(len(data) / 100))
+        self.assertEqual(get_chunked(key), data)
+
+        # A value with missing chunks is gone
+        cache.delete(_chunk_keys(key, manifest[1], manifest[2])[1])
+        self.assertIsNone(get_chunked(key))
+
+    def test_74_read_only_catalog_overlay(self):
+        self.copy_po_file_from_template("./django.po.template")
+        os.chmod(self.dest_file, 292)  # 0444
+        self.addCleanup(os.chmod, self.dest_file, 420)  # 0644
+        key = "e48f149a8b2e8baa81b816c0edf93890"
+
+        self.client.post(self.xx_form_url, {"m_%s" % key: "Hello, world"})
+        r = self.client.get(self.xx_form_url + "?msg_filter=translated")
+        self.assertContains(r, "Hello, world")
+
+        # The catalog parsed from disk is left alone, and shared with the other
+        # users
+        base = po_file_cache.get(self.dest_file, 78)
+        self.assertEqual(find_entry(base, key).msgstr, "")
+        other = Client()
+        other.force_login(self.user)
+        r = other.get(self.xx_form_url + "?msg_filter=translated")
+        self.assertNotContains(r, "Hello, world")
+
+        # Only the changed entry is stored
+        request = RequestFactory().get(self.xx_form_url)
+        request.user = self.user
+        request.session = self.client.session
+        overlay = get_storage(request).get("po-overlay-%s" % self.dest_file)
+        self.assertEqual(list(overlay), [key])
+
+        # The changes are applied to the downloaded catalog
+        kwargs = {"po_filter": "third-party", "lang_id": "xx", "idx": 0}
+        r = self.client.get(reverse("rosetta-download-file", kwargs=kwargs))
+        with zipfile.ZipFile(BytesIO(r.content)) as zipf:
+            po_file = pofile(zipf.read("django.po").decode("utf8"))
+        self.assertEqual(po_file.find("String 2").msgstr, "Hello, world")
+        self.assertEqual(len(po_file), len(base))
+
+        # Reverting the change empties the overlay
+        self.client.post(self.xx_form_url, {"m_%s" % key: ""})
+        overlay = get_storage(request).get("po-overlay-%s" % self.dest_file)
+        self.assertEqual(overlay, {})
+
+    def test_75_overlay_pofile(self):
+        base = load_pofile(os.path.join(self.curdir, "django.po.template"))
+        key = entry_key(base.find("String 2"))
+        po_file = overlay_pofile(
+            base, {key: ["Hola", [], True], "missing": ["", [], False]}
+        )
+        entry = find_entry(po_file, key)
+        self.assertEqual((entry.msgstr, entry.fuzzy), ("Hola", True))
+        self.assertEqual(find_entry(base, key).msgstr, "")
+        self.assertEqual(len(po_file), len(base))
+
+        # The other entries are shared until they are owned
+        other = po_file[0]
+        self.assertIs(other, base[0])
+        owned = own_entry(po_file, other)
+        self.assertIsNot(owned, other)
+        self.assertIs(po_file[0], owned)
+        self.assertIs(find_entry(po_file, entry_key(owned)), owned)
+        self.assertIs(own_entry(po_file, owned), owned)
+
+        owned.msgstr = "Changed"
+        overlay = update_overlay({key: ["Hola", [], True]}, po_file, [owned, entry])
+        self.assertEqual(
+            overlay, {entry_key(owned): ["Changed", [], False], key: ["Hola", [], True]}
+        )
+        entry.msgstr = ""
+        entry.flags.remove("fuzzy")
+        self.assertEqual(
+            list(update_overlay(overlay, po_file, [entry])), [entry_key(owned)]
+        )
+
+        # Overlaid catalogs are searched with the index of their base, patched
+        # with their own entries
+        with mock.patch("rosetta.pocache.SearchIndex", wraps=SearchIndex) as index_mock:
+            po_file = overlay_pofile(base, {key: ["Hola", [], True]})
+            results = search_entries(po_file, "hola")
+            self.assertEqual([e.msgid for e in results], ["String 2"])
+            po_file = overlay_pofile(base, {})
+            self.assertEqual(list(search_entries(po_file, "hola")), [])
+            entry = own_entry(po_file, find_entry(po_file, key))
+            entry.msgstr = "Hola"
+            entries_changed(po_file, [entry])
+            self.assertEqual(list(search_entries(po_file, "hola")), [entry])
+            self.assertEqual(list(search_entries(base, "hola")), [])
+        index_mock.assert_called_once_with(base)
+
+        # ... and start from the filter partitions of their base
+        with mock.patch(
+            "rosetta.pocache.FilterPartitions", wraps=FilterPartitions
+        ) as partitions_mock:
+            po_file = overlay_pofile(base, {key: ["Hola", [], False]})
+            translated = filtered_entries(po_file, "translated")
+            self.assertIn("String 2", [e.msgid for e in translated])
+            po_file = overlay_pofile(base, {})
+            translated = filtered_entries(po_file, "translated")
+            self.assertNotIn("String 2", [e.msgid for e in translated])
+        partitions_mock.assert_called_once_with(base)
+
+    def test_76_shared_catalog_cache(self):
+        self.copy_po_file_from_template("./django.po.template")
+
+        # The first process to need a catalog parses it and shares it...
+        first = POFileCache().get(self.dest_file, 78)
+        # ... with the others, which don't need to parse it
+        with mock.patch("rosetta.pocache.load_pofile") as load:
+            second = POFileCache().get(self.dest_file, 78)
+        load.assert_not_called()
+        self.assertEqual(str(second), str(first))
+        self.assertEqual(second.fpath, self.dest_file)
+
+        # Once changed on disk, the catalog is parsed again
+        self.copy_po_file_from_template("./django.po.test44.template")
+        with mock.patch(
+            "rosetta.pocache.load_pofile", wraps=load_pofile
+        ) as load, override_settings(ROSETTA_SHARED_CATALOG_CACHE=False):
+            POFileCache().get(self.dest_file, 78)
+            POFileCache().get(self.dest_file, 78)
+        self.assertEqual(load.call_count, 2)
+        with mock.patch("rosetta.pocache.load_pofile", wraps=load_pofile) as load:
+            third = POFileCache().get(self.dest_file, 78)
+            POFileCache().get(self.dest_file, 78)
+        self.assertEqual(load.call_count, 1)
+        self.assertNotEqual(str(third), str(first))
+
+        # The shared catalog can be saved incrementally
+        entry = third.find("String 1")
+        entry.msgstr = "Uno"
+        with mock.patch.object(POFile, "save") as save:
+            save_pofile(third, [entry])
+        save.assert_not_called()
+        self.assertEqual(pofile(self.dest_file).find("String 1").msgstr, "Uno")
+
+    @override_settings(ROSETTA_STORAGE_CLASS="rosetta.storage.CacheRosettaStorage")
+    def test_77_storage_many_and_request_storage(self):
+        request = RequestFactory().get(self.xx_form_url)
+        request.user = self.user
+        request.session = self.client.session
+        po_file = load_pofile(os.path.join(self.curdir, "django.po.template"))
+
+        # The cache is only checked once per process
+        with mock.patch("rosetta.storage._cache_checked", False), mock.patch.object(
+            cache, "set", wraps=cache.set
+        ) as cache_set:
+            get_storage(request)
+            get_storage(request)
+        self.assertEqual(cache_set.call_count, 1)
+
+        storage = get_storage(request)
+        storage.set_many({"a": 1, "b": {"c": 2}, "catalog": po_file})
+        values = storage.get_many(["a", "b", "catalog", "missing"])
+        self.assertEqual(sorted(values), ["a", "b", "catalog"])
+        self.assertEqual(values["b"], {"c": 2})
+        self.assertEqual(str(values["catalog"]), str(po_file))
+        storage.delete_many(["a", "catalog", "missing"])
+        self.assertEqual(storage.get_many(["a", "b", "catalog"]), {"b": {"c": 2}})
+
+        # The storage of a request is read once, and written at the end
+        self.assertIs(get_request_storage(request), get_request_storage(request))
+        wrapped = get_request_storage(request)
+        with mock.patch.object(
+            storage, "get_many", wraps=storage.get_many
+        ) as get_many, mock.patch("rosetta.storage.get_storage", return_value=storage):
+            self.assertEqual(wrapped.get("b"), {"c": 2})
+            self.assertIsNone(wrapped.get("a"))
+            self.assertEqual(wrapped.get("b"), {"c": 2})
+            self.assertFalse(wrapped.has("a"))
+            self.assertEqual(get_many.call_count, 2)
+            wrapped.set("a", 3)
+            wrapped.delete("b")
+            self.assertEqual(wrapped.get_many(["a", "b"]), {"a": 3})
+            self.assertEqual(storage.get_many(["a", "b"]), {"b": {"c": 2}})
+            flush_request_storage(request)
+        self.assertEqual(storage.get_many(["a", "b"]), {"a": 3})
+
+    def test_78_file_storage(self):
+        storage_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage_dir)
+        request = RequestFactory().get(self.xx_form_url)
+        request.user = self.user
+        request.session = self.client.session
+
+        with override_settings(
+            ROSETTA_STORAGE_CLASS="rosetta.storage.FileRosettaStorage",
+            ROSETTA_STORAGE_DIR=storage_dir,
+        ):
+            storage = get_storage(request)
+            self.assertIsNone(storage.get("a"))
+            self.assertFalse(storage.has("a"))
+            values = {"key-%d" % i: {"value": i} for i in range(50)}
+            storage.set_many(values)
+            self.assertEqual(storage.get_many(list(values)), values)
+            self.assertTrue(storage.has("key-10"))
+            storage.delete("key-10")
+            storage.delete_many(["key-11", "missing"])
+            self.assertEqual(
+                storage.get_many(["key-10", "key-11", "key-12"]),
+                {"key-12": {"value": 12}},
+            )
+
+            # The file is indexed, and replaced as a whole when written
+            with open(storage.path, "rb") as f:
+                self.assertEqual(f.read(4), b"RSTG")
+            self.assertEqual(
+                [
+                    name
+                    for name in os.listdir(storage_dir)
+                    if not name.endswith(".lock")
+                ],
+                [os.path.basename(storage.path)],
+            )
+
+            # Concurrent writers don't lose each other's changes
+            def write(i):
+                get_storage(request).set("thread-%d" % i, i)
+
+            threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            keys = ["thread-%d" % i for i in range(8)]
+            self.assertEqual(len(storage.get_many(keys)), 8)
+
+            # Changes to read-only catalogs are stored in the user's file
+            self.copy_po_file_from_template("./django.po.template")
+            os.chmod(self.dest_file, 292)  # 0444
+            self.addCleanup(os.chmod, self.dest_file, 420)  # 0644
+            data = {"m_e48f149a8b2e8baa81b816c0edf93890": "Hello, world"}
+            self.client.post(self.xx_form_url, data)
+            r = self.client.get(self.xx_form_url + "?msg_filter=translated")
+            self.assertContains(r, "Hello, world")
+            request.session = self.client.session
+            storage = get_storage(request)
+            overlay = storage.get_overlay(self.dest_file, "xx")
+            self.assertEqual(list(overlay), ["e48f149a8b2e8baa81b816c0edf93890"])
+
+            # Each entry of an overlay is stored on its own: only the changed
+            # ones are serialized
+            overlay["a" * 32] = ["Bonjour", [[0, "Un"], [1, "Deux"]], True]
+            storage.set_overlay(self.dest_file, "xx", overlay, ["a" * 32])
+            overlay["e48f149a8b2e8baa81b816c0edf93890"][0] = "Hi"
+            with mock.patch(
+                "rosetta.storage._encode_json", wraps=_encode_json
+            ) as encode_mock:
+                storage.set_overlay(
+                    self.dest_file,
+                    "xx",
+                    overlay,
+                    ["e48f149a8b2e8baa81b816c0edf93890"],
+                )
+            # (the entry, and the keys of the overlay)
+            self.assertEqual(encode_mock.call_count, 2)
+            self.assertEqual(storage.get_overlay(self.dest_file, "xx"), overlay)
+            del overlay["a" * 32]
+            storage.set_overlay(self.dest_file, "xx", overlay, ["a" * 32])
+            self.assertEqual(storage.get_overlay(self.dest_file, "xx"), overlay)
+            storage.set_overlay(
+                self.dest_file, "xx", {}, ["e48f149a8b2e8baa81b816c0edf93890"]
+            )
+            self.assertEqual(storage.get_overlay(self.dest_file, "xx"), {})
+
+        # The directory is created private, and refused if others can write to it
+        with override_settings(
+            ROSETTA_STORAGE_CLASS="rosetta.storage.FileRosettaStorage",
+            ROSETTA_STORAGE_DIR=os.path.join(storage_dir, "new"),
+        ):
+            get_storage(request)
+            mode = os.stat(os.path.join(storage_dir, "new")).st_mode
+            self.assertEqual(mode & 0o777, 0o700)
+            os.chmod(os.path.join(storage_dir, "new"), 0o777)
+            with self.assertRaises(ImproperlyConfigured):
+                get_storage(request)
+
+    @override_settings(ROSETTA_STORAGE_CLASS="rosetta.storage.DatabaseRosettaStorage")
+    def test_79_database_storage(self):
+        from rosetta.models import EntryEdit
+
+        self.copy_po_file_from_template("./django.po.template")
+        os.chmod(self.dest_file, 292)  # 0444
+        self.addCleanup(os.chmod, self.dest_file, 420)  # 0644
+        key = "e48f149a8b2e8baa81b816c0edf93890"
+
+        self.client.post(self.xx_form_url, {"m_%s" % key: "Hello, world"})
+        edit = EntryEdit.objects.get()
+        self.assertEqual(
+            (edit.po_path, edit.language_code, edit.entry_key),
+            (self.dest_file, "xx", key),
+        )
+        self.assertEqual(
+            (edit.msgstr, edit.fuzzy, edit.version), ("Hello, world", False, 1)
+        )
+        self.assertEqual(edit.updated_by, self.user)
+
+        # The edits are shared by all the users, and read in one query
+        other = Client()
+        other.force_login(self.user)
+        r = other.get(self.xx_form_url + "?msg_filter=translated")
+        self.assertContains(r, "Hello, world")
+        request = RequestFactory().get(self.xx_form_url)
+        request.user = self.user
+        request.session = self.client.session
+        storage = get_storage(request)
+        with self.assertNumQueries(1):
+            overlay = storage.get_overlay(self.dest_file, "xx")
+        self.assertEqual(overlay, {key: ["Hello, world", [], False]})
+
+        # Edits are updated in place...
+        other.post(self.xx_form_url, {"m_%s" % key: "Hi", "f_%s" % key: "on"})
+        edit = EntryEdit.objects.get()
+        self.assertEqual((edit.msgstr, edit.fuzzy, edit.version), ("Hi", True, 2))
+        # ... and deleted when reverted
+        self.client.post(self.xx_form_url, {"m_%s" % key: ""})
+        self.assertFalse(EntryEdit.objects.exists())
+
+    def test_80_export_edits(self):
+        from rosetta.models import EntryEdit
+
+        self.copy_po_file_from_template("./django.po.issue186.template")
+        po_file = pofile(self.dest_file)
+        entry = po_file.find("String 1")
+        plural_entry = next(e for e in po_file if e.msgid_plural)
+        EntryEdit.objects.create(
+            po_path=self.dest_file,
+            language_code="xx",
+            entry_key=entry_key(entry),
+            msgstr="Uno",
+        )
+        EntryEdit.objects.create(
+            po_path=self.dest_file,
+            language_code="xx",
+            entry_key=entry_key(plural_entry),
+            msgstr_plural=[[0, "Singular"], [1, "Plural"]],
+            fuzzy=True,
+        )
+        EntryEdit.objects.create(
+            po_path="/does/not/exist.po", language_code="xx", entry_key="abc"
+        )
+        mo_file = os.path.splitext(self.dest_file)[0] + ".mo"
+        self.addCleanup(lambda: os.path.exists(mo_file) and os.remove(mo_file))
+
+        out, err = StringIO(), StringIO()
+        call_command("rosetta_export_edits", delete=True, stdout=out, stderr=err)
+        self.assertIn("Exported 2 edits to %s" % self.dest_file, out.getvalue())
+        self.assertIn("Skipped /does/not/exist.po", err.getvalue())
+
+        po_file = pofile(self.dest_file)
+        self.assertEqual(po_file.find("String 1").msgstr, "Uno")
+        plural_entry = po_file.find(plural_entry.msgid)
+        self.assertEqual(plural_entry.msgstr_plural, {0: "Singular", 1: "Plural"})
+        self.assertTrue(plural_entry.fuzzy)
+        self.assertEqual(mofile(mo_file).find("String 1").msgstr, "Uno")
+        self.assertEqual(
+            list(EntryEdit.objects.values_list("po_path", flat=True)),
+            ["/does/not/exist.po"],
+        )
+
+    @override_settings(DEEPL_AUTH_KEY="FAKE", AZURE_CLIENT_SECRET=None)
+    def test_81_translate_many(self):
+        def deepl(url, headers, data):
+            response = mock.Mock()
+            response.json.return_value = {
+                "translations": [{"text": text.upper()} for text in data["text"]]
+            }
+            return response
+
+        texts = ["text %d" % i for i in range(120)]
+        with mock.patch(
+            "rosetta.translate_utils.requests.post", side_effect=deepl
+        ) as post:
+            translations = translate_many(texts, "en", "fr")
+        self.assertEqual(translations, [text.upper() for text in texts])
+        # One request per chunk of texts
+        self.assertEqual(post.call_count, 3)
+        self.assertEqual(post.call_args[1]["data"]["target_lang"], "FR")
+        with mock.patch("rosetta.translate_utils.requests.post") as post:
+            self.assertEqual(translate_many([], "en", "fr"), [])
+        post.assert_not_called()
+
+        chunks = list(chunk_texts(["a" * 6, "b" * 6, "c" * 20, "d"], 3, 10))
+        self.assertEqual(chunks, [["a" * 6], ["b" * 6], ["c" * 20], ["d"]])
+        chunks = list(chunk_texts(["a", "b", "c", "d"], 3, 10))
+        self.assertEqual(chunks, [["a", "b", "c"], ["d"]])
+
+    def test_82_translate_texts_view(self):
+        url = reverse("rosetta.translate_texts")
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+        body = {"from": "en", "to": "fr", "texts": ["hello", "world"]}
+        with mock.patch(
+            "rosetta.views.translate_many", return_value=["bonjour", "monde"]
+        ) as translate:
+            r = self.client.post(url, body, content_type="application/json")
+        translate.assert_called_once_with(["hello", "world"], "en", "fr")
+        self.assertEqual(
+            r.json(), {"success": True, "translations": ["bonjour", "monde"]}
+        )
+
+        body["to"] = "en"
+        r = self.client.post(url, body, content_type="application/json")
+        self.assertEqual(r.json()["translations"], ["hello", "world"])
+
+        body = {"from": "en", "to": "fr", "texts": "hello"}
+        r = self.client.post(url, body, content_type="application/json")
+        self.assertEqual(r.status_code, 400)
+
+        with override_settings(
+            DEEPL_AUTH_KEY=None,
+            AZURE_CLIENT_SECRET=None,
+            GOOGLE_APPLICATION_CREDENTIALS_PATH=None,
+        ):
+            r = self.client.post(
+                url,
+                {"from": "en", "to": "fr", "texts": ["hello"]},
+                content_type="application/json",
+            )
+        self.assertFalse(r.json()["success"])
+
+        with override_settings(ROSETTA_ENABLE_TRANSLATION_SUGGESTIONS=True):
+            r = self.client.get(self.xx_form_url)
+        self.assertContains(r, 'class="suggest-all"')
+
+    def test_83_concurrent_saves(self):
+        self.copy_po_file_from_template("./django.po.test44.template")
+        po_file = po_file_cache.get(self.dest_file, 78)
+        entries = [e for e in po_file if not e.obsolete and e.msgid][:4]
+        errors = []
+
+        def save(entry):
+            try:
+                for i in range(30):
+                    entry.msgstr = "x" * (i * 7 % 23) + '"%d"' % i
+                    save_pofile(po_file, [entry])
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+
+        threads = [threading.Thread(target=save, args=(e,)) for e in entries]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        saved = pofile(self.dest_file)
+        self.assertEqual(str(saved), str(po_file))
+        for entry in entries:
+            self.assertTrue(saved.find(entry.msgid).msgstr.endswith('"29"'))
+
+    def test_84_save_linked_catalog(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        target = os.path.join(tmpdir, "target.po")
+        shutil.copy(os.path.join(self.curdir, "django.po.template"), target)
+        # Symbolic link: the file it points to is replaced
+        link = os.path.join(tmpdir, "link.po")
+        os.symlink(target, link)
+        po_file = po_file_cache.get(link, 78)
+        entry = po_file.find("String 2")
+        entry.msgstr = "Linked"
+        save_pofile(po_file, [entry])
+        self.assertTrue(os.path.islink(link))
+        self.assertEqual(pofile(target).find("String 2").msgstr, "Linked")
+
+        # Hard link: the file is written in place
+        hard_link = os.path.join(tmpdir, "hard_link.po")
+        os.link(target, hard_link)
+        po_file = po_file_cache.get(hard_link, 78)
+        entry = po_file.find("String 2")
+        entry.msgstr = "Hard linked"
+        save_pofile(po_file, [entry])
+        self.assertTrue(os.path.samefile(target, hard_link))
+        self.assertEqual(pofile(target).find("String 2").msgstr, "Hard linked")
+
+    @override_settings(
+        ROSETTA_ENABLE_REFLANG=True, ROSETTA_LANGUAGES=(("xx", "dummy language"),)
+    )
+    def test_85_failed_changes_are_discarded(self):
+        self.copy_po_file_from_template("./django.po.template")
+        r = self.client.get(self.xx_form_url + "?ref_lang=xx")
+        self.assertContains(r, "m_e48f149a8b2e8baa81b816c0edf93890")
+        # The entries of the page are marked up, not the shared ones
+        po_file = po_file_cache.get(self.dest_file, 78)
+        self.assertFalse(any(hasattr(entry, "ref_txt") for entry in po_file))
+
+        def failing_receiver(sender, **kwargs):
+            raise RuntimeError("Failed")
+
+        entry_changed.connect(failing_receiver)
+        self.addCleanup(entry_changed.disconnect, failing_receiver)
+        data = {"m_e48f149a8b2e8baa81b816c0edf93890": "Hello, world"}
+        with self.assertRaises(RuntimeError):
+            self.client.post(self.xx_form_url, data)
+
+        # The change that wasn't saved isn't served
+        po_file = po_file_cache.get(self.dest_file, 78)
+        self.assertEqual(po_file.find("String 2").msgstr, "")
+        r = self.client.get(self.xx_form_url)
+        self.assertNotContains(r, "Hello, world")
+
+    def test_86_entry_key_context(self):
+        def md5(text):
+            return hashlib.md5(text.encode("utf8")).hexdigest()
+
+        # The keys of entries without context are their msgid's digest
+        self.assertEqual(entry_key(POEntry(msgid="abc")), md5("abc"))
+        # The context is separated from the msgid, so keys can't collide
+        entry = POEntry(msgid="ab", msgctxt="c")
+        self.assertEqual(entry_key(entry), md5("c\x04ab"))
+        self.assertNotEqual(entry_key(entry), entry_key(POEntry(msgid="abc")))
+        self.assertNotEqual(
+            entry_key(POEntry(msgid="b", msgctxt="a")),
+            entry_key(POEntry(msgid="", msgctxt="ab")),
+        )
+
     def test_198_embed_in_admin_access_control(self):
         resp = self.client.get(reverse("admin:index"))
         self.assertContains(resp, "rosetta-content-main")
@@ -1060,6 +2302,8 @@ class RosettaTestCase(TestCase):
 
     @mock.patch("rosetta.poutil.os.path.exists")
     def test_273_override_case_sensitivity(self, path_mock):
+        # the auto detection only happens once per process
+        clear_find_pos_cache()
         path_mock.exists.return_value = False
         # no setting
         find_pos("en")
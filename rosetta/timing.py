@@ -0,0 +1,60 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# The timings being recorded for the current request, if any
+_timings = ContextVar("rosetta_timings", default=None)
+
+
+class Timings(object):
+    """
+    The total time spent in each phase of a request (in milliseconds), in the
+    order the phases were first entered.
+    """
+
+    def __init__(self):
+        self.phases = {}
+
+    def add(self, phase, duration):
+        self.phases[phase] = self.phases.get(phase, 0.0) + duration * 1000
+
+    def server_timing(self):
+        """
+        Return the value of a ``Server-Timing`` header for these timings.
+        """
+        return ", ".join(
+            "%s;dur=%.1f" % (phase, duration) for phase, duration in self.phases.items()
+        )
+
+
+@contextmanager
+def recording():
+    """
+    Record the timings of the phases entered within this block, and yield
+    them.
+    """
+    timings = Timings()
+    token = _timings.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings.add("total", time.perf_counter() - start)
+        _timings.reset(token)
+
+
+@contextmanager
+def timed(phase):
+    """
+    Time the block as part of the given phase, if timings are being recorded.
+    """
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - start)
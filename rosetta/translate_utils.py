@@ -1,3 +1,4 @@
+import functools
 import json
 import uuid
 
@@ -10,7 +11,48 @@ class TranslationException(Exception):
     pass
 
 
+# The maximum number of texts, and of characters, sent to each service in a
+# single request
+DEEPL_MAX_TEXTS = 50
+DEEPL_MAX_CHARACTERS = 100000
+AZURE_MAX_TEXTS = 1000
+AZURE_MAX_CHARACTERS = 50000
+GOOGLE_MAX_TEXTS = 1024
+GOOGLE_MAX_CHARACTERS = 30000
+
+
+def chunk_texts(texts, max_texts, max_characters):
+    """
+    Split ``texts`` into lists of at most ``max_texts`` texts and (unless a
+    single text is longer) ``max_characters`` characters.
+    """
+    chunk, characters = [], 0
+    for text in texts:
+        if chunk and (
+            len(chunk) == max_texts or characters + len(text) > max_characters
+        ):
+            yield chunk
+            chunk, characters = [], 0
+        chunk.append(text)
+        characters += len(text)
+    if chunk:
+        yield chunk
+
+
 def translate(text, from_language, to_language):
+    return translate_many([text], from_language, to_language)[0]
+
+
+def translate_many(texts, from_language, to_language):
+    """
+    Translate a list of texts, and return the list of their translations. The
+    texts are sent to the translation service in as few requests as its limits
+    allow.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+
     AZURE_CLIENT_SECRET = getattr(settings, "AZURE_CLIENT_SECRET", None)
     GOOGLE_APPLICATION_CREDENTIALS_PATH = getattr(
         settings, "GOOGLE_APPLICATION_CREDENTIALS_PATH", None
@@ -27,27 +69,43 @@ def translate(text, from_language, to_language):
         if deepl_language_code is None:
             deepl_language_code = to_language[:2].upper()
 
-        return translate_by_deepl(
-            text,
-            deepl_language_code.upper(),
-            DEEPL_AUTH_KEY,
+        translate_chunk = functools.partial(
+            translate_many_by_deepl,
+            to_language=deepl_language_code.upper(),
+            auth_key=DEEPL_AUTH_KEY,
         )
-
+        chunks = chunk_texts(texts, DEEPL_MAX_TEXTS, DEEPL_MAX_CHARACTERS)
     elif AZURE_CLIENT_SECRET:
-        return translate_by_azure(text, from_language, to_language, AZURE_CLIENT_SECRET)
+        translate_chunk = functools.partial(
+            translate_many_by_azure,
+            from_language=from_language,
+            to_language=to_language,
+            subscription_key=AZURE_CLIENT_SECRET,
+        )
+        chunks = chunk_texts(texts, AZURE_MAX_TEXTS, AZURE_MAX_CHARACTERS)
     elif GOOGLE_APPLICATION_CREDENTIALS_PATH and GOOGLE_PROJECT_ID:
-        return translate_by_google(
-            text,
-            from_language,
-            to_language,
-            GOOGLE_APPLICATION_CREDENTIALS_PATH,
-            GOOGLE_PROJECT_ID,
+        translate_chunk = functools.partial(
+            translate_many_by_google,
+            input_language=from_language,
+            output_language=to_language,
+            creadentials_path=GOOGLE_APPLICATION_CREDENTIALS_PATH,
+            project_id=GOOGLE_PROJECT_ID,
         )
+        chunks = chunk_texts(texts, GOOGLE_MAX_TEXTS, GOOGLE_MAX_CHARACTERS)
     else:
         raise TranslationException("No translation API service is configured.")
 
+    translations = []
+    for chunk in chunks:
+        translations.extend(translate_chunk(chunk))
+    return translations
+
 
 def translate_by_deepl(text, to_language, auth_key):
+    return translate_many_by_deepl([text], to_language, auth_key)[0]
+
+
+def translate_many_by_deepl(texts, to_language, auth_key):
     if auth_key.lower().endswith(":fx"):
         endpoint = "https://api-free.deepl.com"
     else:
@@ -58,20 +116,26 @@ def translate_by_deepl(text, to_language, auth_key):
         headers={"Authorization": f"DeepL-Auth-Key {auth_key}"},
         data={
             "target_lang": to_language.upper(),
-            "text": text,
+            "text": texts,
         },
     )
-    return r.json().get("translations")[0].get("text")
+    return [translation.get("text") for translation in r.json().get("translations")]
 
 
 def translate_by_azure(text, from_language, to_language, subscription_key):
+    return translate_many_by_azure(
+        [text], from_language, to_language, subscription_key
+    )[0]
+
+
+def translate_many_by_azure(texts, from_language, to_language, subscription_key):
     """
     This method does the heavy lifting of connecting to the translator API and fetching a response
-    :param text: The source text to be translated
+    :param texts: The list of source texts to be translated
     :param from_language: The language of the source text
     :param to_language: The target language to translate the text into
     :param subscription_key: An API key that grants you access to the Azure translation service
-    :return: Returns the response from the AZURE service as a python object. For more information about the
+    :return: Returns the list of translations from the AZURE service. For more information about the
     response, please visit
     https://docs.microsoft.com/en-us/azure/cognitive-services/translator/reference/v3-0-translate?tabs=curl
     """
@@ -87,7 +151,7 @@ def translate_by_azure(text, from_language, to_language, subscription_key):
 
     url_parameters = {"from": from_language, "to": to_language}
 
-    request_data = [{"text": text}]
+    request_data = [{"text": text} for text in texts]
 
     api_hostname = AZURE_TRANSLATOR_HOST + AZURE_TRANSLATOR_PATH
     r = requests.post(
@@ -127,10 +191,9 @@ def translate_by_azure(text, from_language, to_language, subscription_key):
             # for more information, please visit
             # https://docs.microsoft.com/en-us/azure/cognitive-services/translator/reference/v3-0-translate?tabs=curl
 
-            translations = api_response[0].get("translations")
-            translated_text = translations[0].get("text")
-
-            return translated_text
+            return [
+                result.get("translations")[0].get("text") for result in api_response
+            ]
     except requests.exceptions.RequestException as err:
         raise TranslationException(
             "Error connecting to Microsoft Translation Service: {0}".format(err)
@@ -139,6 +202,14 @@ def translate_by_azure(text, from_language, to_language, subscription_key):
 
 def translate_by_google(
     text, input_language, output_language, creadentials_path, project_id
+):
+    return translate_many_by_google(
+        [text], input_language, output_language, creadentials_path, project_id
+    )[0]
+
+
+def translate_many_by_google(
+    texts, input_language, output_language, creadentials_path, project_id
 ):
     from google.cloud import translate as google_translate
 
@@ -150,7 +221,7 @@ def translate_by_google(
         api_response = client.translate_text(
             request=dict(
                 parent=parent,
-                contents=[text],
+                contents=texts,
                 mime_type="text/plain",
                 source_language_code=input_language,
                 target_language_code=output_language.split(".", 1)[0],
@@ -159,4 +230,7 @@ def translate_by_google(
     except Exception as e:
         raise TranslationException("Google API error: {}".format(e))
     else:
-        return str(api_response.translations[0].translated_text)
+        return [
+            str(translation.translated_text)
+            for translation in api_response.translations
+        ]
@@ -36,5 +36,13 @@ urlpatterns = [
         views.TranslationFileDownload.as_view(),
         name="rosetta-download-file",
     ),
+    re_path(
+        r"^files/(?P<po_filter>[\w-]+)/(?P<lang_id>[\w\-_\.@]+)/(?P<idx>\d+)/bulk/$",
+        views.TranslationBulkUpdateView.as_view(),
+        name="rosetta-bulk-update",
+    ),
     re_path(r"^translate/$", views.translate_text, name="rosetta.translate_text"),
+    re_path(
+        r"^translate/many/$", views.translate_texts, name="rosetta.translate_texts"
+    ),
 ]
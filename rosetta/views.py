@@ -1,8 +1,11 @@
-import hashlib
+import copy
+import json
+import logging
 import os
 import os.path
 import re
 import zipfile
+from contextlib import contextmanager
 from io import BytesIO
 from urllib.parse import urlencode
 
@@ -18,16 +21,45 @@ from django.utils.decorators import method_decorator
 from django.utils.encoding import force_bytes
 from django.utils.functional import Promise, cached_property
 from django.utils.translation import gettext_lazy as _
+from django.utils.translation import ngettext
 from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
 from django.views.generic import TemplateView, View
 
 from . import get_version as get_rosetta_version
 from .access import can_translate, can_translate_language
+from .compiler import compile_status, compile_worker
 from .conf import settings as rosetta_settings
-from .poutil import find_pos, pagination_range, timestamp_with_timezone
-from .signals import entry_changed, post_save
-from .storage import get_storage
-from .translate_utils import TranslationException, translate
+from .invalidation import catalog_changed
+from .pocache import (
+    catalog_lock,
+    entries_changed,
+    entry_key,
+    entry_version,
+    filtered_entries,
+    find_entry,
+    overlay_pofile,
+    own_entry,
+    po_file_cache,
+    save_pofile,
+    search_entries,
+    update_overlay,
+)
+from .poutil import (
+    find_pos,
+    find_pos_many,
+    pagination_range,
+    pofile_stats_many,
+    timestamp_with_timezone,
+)
+from .reload import reload_language
+from .signals import entry_changed, post_save, timings_recorded
+from .storage import flush_request_storage, get_request_storage
+from .timing import recording, timed
+from .translate_utils import TranslationException, translate, translate_many
+
+
+logger = logging.getLogger("rosetta.timing")
 
 
 def get_app_name(path):
@@ -54,7 +86,39 @@ class RosettaBaseMixin(object):
     """
 
     def dispatch(self, *args, **kwargs):
-        return super(RosettaBaseMixin, self).dispatch(*args, **kwargs)
+        if not rosetta_settings.SERVER_TIMING:
+            return self._dispatch(*args, **kwargs)
+
+        with recording() as timings:
+            response = self._dispatch(*args, **kwargs)
+            # Template responses would be rendered after we return otherwise
+            if hasattr(response, "render") and not response.is_rendered:
+                with timed("render"):
+                    response.render()
+        response["Server-Timing"] = timings.server_timing()
+
+        po_file = self.__dict__.get("po_file")
+        info = {
+            "po_path": self.__dict__.get("po_file_path"),
+            "entry_count": len(po_file) if po_file is not None else None,
+            "timings": timings.phases,
+        }
+        timings_recorded.send(sender=self.__class__, request=self.request, **info)
+        logger.debug(
+            "%s %s: %s",
+            self.request.method,
+            self.request.path,
+            timings.server_timing(),
+            extra=info,
+        )
+        return response
+
+    def _dispatch(self, *args, **kwargs):
+        response = super(RosettaBaseMixin, self).dispatch(*args, **kwargs)
+        # The writes to the storage made during the request are sent at once
+        with timed("storage"):
+            flush_request_storage(self.request)
+        return response
 
     @cached_property
     def po_filter(self):
@@ -142,43 +206,30 @@ class RosettaFileLevelMixin(RosettaBaseMixin):
         """
         if self.po_file_is_writable:
             # If we can write changes to file, then we pull it up fresh with
-            # each request.
+            # each request, unless this process already parsed the very same
+            # version of the file.
             # XXX: brittle; what if this path doesn't exist? Isn't a .po file?
-            po_file = pofile(
-                self.po_file_path, wrapwidth=rosetta_settings.POFILE_WRAP_WIDTH
+            po_file = po_file_cache.get(
+                self.po_file_path, rosetta_settings.POFILE_WRAP_WIDTH
             )
-            for entry in po_file:
-                # Entry is an object representing a single entry in the catalog.
-                # We iterate through the *entire catalog*, pasting a hashed
-                # value of the meat of each entry on its side in an attribute
-                # called "md5hash".
-                str_to_hash = (
-                    str(entry.msgid) + str(entry.msgstr) + str(entry.msgctxt or "")
-                ).encode("utf8")
-                entry.md5hash = hashlib.md5(str_to_hash).hexdigest()
         else:
-            storage = get_storage(self.request)
-            po_file = storage.get(self.po_file_cache_key, None)
-            if not po_file:
-                po_file = pofile(self.po_file_path)
-                for entry in po_file:
-                    # Entry is an object representing a single entry in the
-                    # catalog. We iterate through the entire catalog, pasting
-                    # a hashed value of the meat of each entry on its side in
-                    # an attribute called "md5hash".
-                    str_to_hash = (
-                        str(entry.msgid) + str(entry.msgstr) + str(entry.msgctxt or "")
-                    ).encode("utf8")
-                    entry.md5hash = hashlib.new("md5", str_to_hash).hexdigest()
-                storage.set(self.po_file_cache_key, po_file)
+            # Otherwise, the catalog parsed from disk is shared between users,
+            # and only the changes of each user (their "overlay") are kept in
+            # the storage.
+            base = po_file_cache.get(
+                self.po_file_path, rosetta_settings.POFILE_WRAP_WIDTH
+            )
+            po_file = overlay_pofile(base, self.po_file_overlay)
         return po_file
 
     @cached_property
-    def po_file_cache_key(self):
-        """Return the cache key used to save/access the .po file (when actually
-        persisted in cache).
+    def po_file_overlay(self):
+        """Return the changes made to the .po file that are kept in the
+        storage (when they can't be written to the file).
         """
-        return "po-file-%s" % self.po_file_path
+        return get_request_storage(self.request).get_overlay(
+            self.po_file_path, self.language_id
+        )
 
     @cached_property
     def po_file_is_writable(self):
@@ -188,6 +239,180 @@ class RosettaFileLevelMixin(RosettaBaseMixin):
         # (This was formerly called 'rosetta_i18n_write'.)
         return os.access(self.po_file_path, os.W_OK)
 
+    def fix_nls(self, in_, out_):
+        """Fixes submitted translations by filtering carriage returns and pairing
+        newlines at the begging and end of the translated string with the original
+        """
+        if 0 == len(in_) or 0 == len(out_):
+            return out_
+
+        if "\r" in out_ and "\r" not in in_:
+            out_ = out_.replace("\r", "")
+
+        if "\n" == in_[0] and "\n" != out_[0]:
+            out_ = "\n" + out_
+        elif "\n" != in_[0] and "\n" == out_[0]:
+            out_ = out_.lstrip()
+        if 0 == len(out_):
+            pass
+        elif "\n" == in_[-1] and "\n" != out_[-1]:
+            out_ = out_ + "\n"
+        elif "\n" != in_[-1] and "\n" == out_[-1]:
+            out_ = out_.rstrip()
+        return out_
+
+    @contextmanager
+    def changing_catalog(self):
+        """Hold the lock of the catalog while its entries are changed and
+        saved: writable catalogs are shared by the threads of the process
+        (through the process cache). If anything goes wrong before the changes
+        are saved, the cached catalog is discarded so that other requests don't
+        see them.
+        """
+        with catalog_lock(self.po_file_path):
+            try:
+                yield
+            except BaseException:
+                po_file_cache.discard(self.po_file_path)
+                raise
+
+    def update_entry(self, entry, msgstrs, is_fuzzy=None):
+        """Update the translation(s) of ``entry`` with the given
+        ``(plural_id, msgstr)`` pairs (``plural_id`` being ``None`` for the
+        msgstr of an entry without plural forms), and its fuzzy flag unless
+        ``is_fuzzy`` is ``None``.
+
+        Return the entry if it actually changed, in which case the
+        ``entry_changed`` signal is sent, or ``None``. The entries of read-only
+        catalogs are shared between users, so a copy of ``entry`` is changed
+        (and returned) instead.
+        """
+        if not self.po_file_is_writable:
+            entry = own_entry(self.po_file, entry)
+        old_msgstr = entry.msgstr
+        old_version = entry_version(entry)
+        for plural_id, new_msgstr in msgstrs:
+            if plural_id is not None:  # 0 is ok!
+                entry.msgstr_plural[plural_id] = self.fix_nls(
+                    entry.msgid_plural, new_msgstr
+                )
+            else:
+                entry.msgstr = self.fix_nls(entry.msgid, new_msgstr)
+
+        old_fuzzy = "fuzzy" in entry.flags
+        if is_fuzzy is None:
+            pass
+        elif old_fuzzy and not is_fuzzy:
+            entry.flags.remove("fuzzy")
+        elif not old_fuzzy and is_fuzzy:
+            entry.flags.append("fuzzy")
+
+        if entry_version(entry) == old_version:
+            return None
+        entry_changed.send(
+            sender=entry,
+            user=self.request.user,
+            old_msgstr=old_msgstr,
+            old_fuzzy=old_fuzzy,
+            pofile=self.po_file_path,
+            language_code=self.language_id,
+        )
+        return entry
+
+    def save_changes(self, changed_entries):
+        """Save the catalog after the given entries were changed: the .po file
+        is written out (and compiled) if it is writable, otherwise the changes
+        are recorded in the user's overlay (so they can be downloaded).
+
+        Errors raised while saving the file are propagated.
+        """
+        if not changed_entries:
+            return
+        try:
+            entries_changed(self.po_file, changed_entries)
+
+            if not self.po_file_is_writable:
+                get_request_storage(self.request).set_overlay(
+                    self.po_file_path,
+                    self.language_id,
+                    update_overlay(self.po_file_overlay, self.po_file, changed_entries),
+                    [entry_key(entry) for entry in changed_entries],
+                )
+                return
+
+            try:
+                self.po_file.metadata["Last-Translator"] = "{} {} <{}>".format(
+                    getattr(self.request.user, "first_name", "Anonymous"),
+                    getattr(self.request.user, "last_name", "User"),
+                    getattr(self.request.user, "email", "anonymous@user.tld"),
+                )
+                self.po_file.metadata["X-Translated-Using"] = "django-rosetta %s" % (
+                    get_rosetta_version()
+                )
+                self.po_file.metadata["PO-Revision-Date"] = timestamp_with_timezone()
+            except UnicodeDecodeError:
+                pass
+
+            save_pofile(self.po_file, changed_entries)
+            # Keep the catalog we just saved around for the next request
+            po_file_cache.update(
+                self.po_file_path, rosetta_settings.POFILE_WRAP_WIDTH, self.po_file
+            )
+        except Exception:
+            # Don't keep serving changes that weren't saved
+            po_file_cache.discard(self.po_file_path)
+            raise
+        po_filepath, ext = os.path.splitext(self.po_file_path)
+
+        reload_after_compile = False
+        if rosetta_settings.AUTO_COMPILE:
+            if rosetta_settings.AUTO_COMPILE_IN_BACKGROUND:
+                # The processes are reloaded once the .mo file is compiled
+                compile_worker.schedule(
+                    self.po_file_path, on_compiled=self.reload_processes
+                )
+                reload_after_compile = True
+            else:
+                with timed("compile"):
+                    self.po_file.save_as_mofile(po_filepath + ".mo")
+
+        post_save.send(
+            sender=None, language_code=self.language_id, request=self.request
+        )
+        if not reload_after_compile:
+            self.reload_processes()
+
+    def reload_processes(self):
+        """Reload the translations of this process or the server processes, if
+        configured to, so that they use the new translations.
+        """
+        # Reload the translations of the language in this process
+        if rosetta_settings.GETTEXT_AUTO_RELOAD:
+            reload_language(self.language_id)
+        # Let the other processes know
+        catalog_changed(self.po_file_path, self.language_id)
+        # Try auto-reloading via the WSGI daemon mode reload mechanism
+        should_try_wsgi_reload = (
+            rosetta_settings.WSGI_AUTO_RELOAD
+            and "mod_wsgi.process_group" in self.request.environ
+            and self.request.environ.get("mod_wsgi.process_group", None)
+            and "SCRIPT_FILENAME" in self.request.environ
+            and int(self.request.environ.get("mod_wsgi.script_reloading", 0))
+        )
+        if should_try_wsgi_reload:
+            try:
+                os.utime(self.request.environ.get("SCRIPT_FILENAME"), None)
+            except OSError:
+                pass
+        # Try auto-reloading via uwsgi daemon reload mechanism
+        if rosetta_settings.UWSGI_AUTO_RELOAD:
+            try:
+                import uwsgi
+
+                uwsgi.reload()  # pretty easy right?
+            except Exception:
+                pass  # we may not be running under uwsgi :P
+
 
 class TranslationFileListView(RosettaBaseMixin, TemplateView):
     """Lists the languages, the gettext catalog files that can be translated,
@@ -204,20 +429,30 @@ class TranslationFileListView(RosettaBaseMixin, TemplateView):
         django_apps = self.po_filter in ("all", "django")
         project_apps = self.po_filter in ("all", "project")
 
+        allowed_languages = [
+            language
+            for language in rosetta_settings.ROSETTA_LANGUAGES
+            if can_translate_language(self.request.user, language[0])
+        ]
+        # Scan every locale directory once, for all the languages
+        all_po_paths = find_pos_many(
+            [language[0] for language in allowed_languages],
+            project_apps=project_apps,
+            django_apps=django_apps,
+            third_party_apps=third_party_apps,
+        )
+
+        # Only the catalogs that changed since the last visit are parsed
+        all_stats = pofile_stats_many(
+            [path for po_paths in all_po_paths.values() for path in po_paths]
+        )
+
         languages = []
         has_pos = False
-        for language in rosetta_settings.ROSETTA_LANGUAGES:
-            if not can_translate_language(self.request.user, language[0]):
-                continue
-
-            po_paths = find_pos(
-                language[0],
-                project_apps=project_apps,
-                django_apps=django_apps,
-                third_party_apps=third_party_apps,
-            )
+        for language in allowed_languages:
+            po_paths = all_po_paths[language[0]]
             po_files = [
-                (get_app_name(lang), os.path.realpath(lang), pofile(lang))
+                (get_app_name(lang), os.path.realpath(lang), all_stats[lang])
                 for lang in po_paths
             ]
             po_files.sort(key=lambda app: app[0])
@@ -253,28 +488,6 @@ class TranslationFormView(RosettaFileLevelMixin, TemplateView):
     http_method_names = ["get", "post"]
     template_name = "rosetta/form.html"
 
-    def fix_nls(self, in_, out_):
-        """Fixes submitted translations by filtering carriage returns and pairing
-        newlines at the begging and end of the translated string with the original
-        """
-        if 0 == len(in_) or 0 == len(out_):
-            return out_
-
-        if "\r" in out_ and "\r" not in in_:
-            out_ = out_.replace("\r", "")
-
-        if "\n" == in_[0] and "\n" != out_[0]:
-            out_ = "\n" + out_
-        elif "\n" != in_[0] and "\n" == out_[0]:
-            out_ = out_.lstrip()
-        if 0 == len(out_):
-            pass
-        elif "\n" == in_[-1] and "\n" != out_[-1]:
-            out_ = out_ + "\n"
-        elif "\n" != in_[-1] and "\n" == out_[-1]:
-            out_ = out_.rstrip()
-        return out_
-
     def post(self, request, *args, **kwargs):
         """The only circumstances when we POST is to submit the main form, both
         updating translations (if any changed) and advancing to the next page of
@@ -284,17 +497,24 @@ class TranslationFormView(RosettaFileLevelMixin, TemplateView):
         fields are ignored and a generic failure message is shown.
 
         Submitted changes are saved out to the specified .po file on the
-        filesystem if that file is writable, otherwise the cached version of the
-        file is updated (so it can be downloaded). Then the user is redirected
+        filesystem if that file is writable, otherwise they are kept in the
+        storage (so they can be downloaded). Then the user is redirected
         to the next page of messages (if there is one; otherwise they're
         redirected back to the current page).
+
+        The form can also submit one of the ``bulk_actions``, which is applied
+        to all the messages of the current view, see ``apply_bulk_action``.
         """
-        # The message text inputs are captured as hashes of their initial
-        # contents, preceded by "m_". Messages with plurals end with their
-        # variation number.
+        bulk_action = request.POST.get("bulk_action")
+        if bulk_action:
+            return self.apply_bulk_action(bulk_action)
+
+        # The message text inputs are captured as the keys of their entries,
+        # preceded by "m_". Messages with plurals end with their variation
+        # number.
         single_text_input_regex = re.compile(r"^m_([0-9a-f]+)$")
         plural_text_input_regex = re.compile(r"^m_([0-9a-f]+)_([0-9]+)$")
-        file_change = False
+        submitted = {}
         for field_name, new_msgstr in request.POST.items():
             md5hash = None
 
@@ -315,100 +535,45 @@ class TranslationFormView(RosettaFileLevelMixin, TemplateView):
                 plural_id = None
 
             if md5hash is not None:  # Empty string should be processed!
-                entry = self.po_file.find(md5hash, "md5hash")
-                # If someone did a makemessage, some entries might
-                # have been removed, so we need to check.
-                if entry:
-                    old_msgstr = entry.msgstr
-                    if plural_id is not None:  # 0 is ok!
-                        entry.msgstr_plural[plural_id] = self.fix_nls(
-                            entry.msgid_plural, new_msgstr
-                        )
-                    else:
-                        entry.msgstr = self.fix_nls(entry.msgid, new_msgstr)
-
-                    is_fuzzy = bool(self.request.POST.get("f_%s" % md5hash, False))
-                    old_fuzzy = "fuzzy" in entry.flags
-
-                    if old_fuzzy and not is_fuzzy:
-                        entry.flags.remove("fuzzy")
-                    elif not old_fuzzy and is_fuzzy:
-                        entry.flags.append("fuzzy")
-
-                    file_change = True
-
-                    if old_msgstr != new_msgstr or old_fuzzy != is_fuzzy:
-                        entry_changed.send(
-                            sender=entry,
-                            user=request.user,
-                            old_msgstr=old_msgstr,
-                            old_fuzzy=old_fuzzy,
-                            pofile=self.po_file_path,
-                            language_code=self.language_id,
-                        )
-                else:
-                    messages.error(
-                        self.request,
-                        _(
-                            "Some items in your last translation block couldn't "
-                            "be saved: this usually happens when the catalog file "
-                            "changes on disk after you last loaded it."
-                        ),
-                    )
-
-        if file_change and self.po_file_is_writable:
-            try:
-                self.po_file.metadata["Last-Translator"] = "{} {} <{}>".format(
-                    getattr(self.request.user, "first_name", "Anonymous"),
-                    getattr(self.request.user, "last_name", "User"),
-                    getattr(self.request.user, "email", "anonymous@user.tld"),
-                )
-                self.po_file.metadata["X-Translated-Using"] = "django-rosetta %s" % (
-                    get_rosetta_version()
+                submitted.setdefault(md5hash, []).append((plural_id, new_msgstr))
+
+        # The entries are checked, changed and saved in one go
+        with self.changing_catalog():
+            save_conflict = False
+            changed_entries = []
+            for md5hash, fields in submitted.items():
+                entry = find_entry(self.po_file, md5hash)
+                # If someone did a makemessage, some entries might have been
+                # removed, so we need to check. Entries that were changed since the
+                # form was rendered (as told by their version token) are left
+                # alone too.
+                version = self.request.POST.get("v_%s" % md5hash)
+                if not entry or (version and version != entry_version(entry)):
+                    save_conflict = True
+                    continue
+
+                is_fuzzy = bool(self.request.POST.get("f_%s" % md5hash, False))
+                # Entries submitted as they were don't need to be saved
+                entry = self.update_entry(entry, fields, is_fuzzy)
+                if entry is not None:
+                    changed_entries.append(entry)
+
+            if save_conflict:
+                messages.error(
+                    self.request,
+                    _(
+                        "Some items in your last translation block couldn't "
+                        "be saved: this usually happens when the catalog file "
+                        "changes on disk after you last loaded it."
+                    ),
                 )
-                self.po_file.metadata["PO-Revision-Date"] = timestamp_with_timezone()
-            except UnicodeDecodeError:
-                pass
 
             try:
-                self.po_file.save()
-                po_filepath, ext = os.path.splitext(self.po_file_path)
-
-                if rosetta_settings.AUTO_COMPILE:
-                    self.po_file.save_as_mofile(po_filepath + ".mo")
-
-                post_save.send(
-                    sender=None, language_code=self.language_id, request=self.request
-                )
-                # Try auto-reloading via the WSGI daemon mode reload mechanism
-                should_try_wsgi_reload = (
-                    rosetta_settings.WSGI_AUTO_RELOAD
-                    and "mod_wsgi.process_group" in self.request.environ
-                    and self.request.environ.get("mod_wsgi.process_group", None)
-                    and "SCRIPT_FILENAME" in self.request.environ
-                    and int(self.request.environ.get("mod_wsgi.script_reloading", 0))
-                )
-                if should_try_wsgi_reload:
-                    try:
-                        os.utime(self.request.environ.get("SCRIPT_FILENAME"), None)
-                    except OSError:
-                        pass
-                # Try auto-reloading via uwsgi daemon reload mechanism
-                if rosetta_settings.UWSGI_AUTO_RELOAD:
-                    try:
-                        import uwsgi
-
-                        uwsgi.reload()  # pretty easy right?
-                    except Exception:
-                        pass  # we may not be running under uwsgi :P
+                self.save_changes(changed_entries)
                 # XXX: It would be nice to add a success message here!
             except Exception as e:
                 messages.error(self.request, e)
 
-        if file_change and not self.po_file_is_writable:
-            storage = get_storage(self.request)
-            storage.set(self.po_file_cache_key, self.po_file)
-
         # Reconstitute url to redirect to. Start with determining whether the
         # page number can be incremented.
         paginator = Paginator(self.get_entries(), rosetta_settings.MESSAGES_PER_PAGE)
@@ -436,25 +601,90 @@ class TranslationFormView(RosettaFileLevelMixin, TemplateView):
             )
         )
 
+    # The actions that can be applied to all the messages of the current view
+    bulk_actions = (
+        ("clear_fuzzy", _("Clear the fuzzy flag")),
+        ("mark_fuzzy", _("Mark as fuzzy")),
+        ("copy_msgid", _("Copy the original text of untranslated messages")),
+    )
+
+    def bulk_action_changes(self, action, entry):
+        """Return the ``(msgstrs, is_fuzzy)`` arguments of ``update_entry`` to
+        apply the given bulk action to ``entry``, or ``None`` if it doesn't
+        apply to it.
+        """
+        if action == "clear_fuzzy":
+            return [], False
+        elif action == "mark_fuzzy":
+            return [], True
+        elif action == "copy_msgid" and not entry.translated():
+            if entry.msgid_plural:
+                msgstrs = [
+                    (plural_id, entry.msgid if plural_id == 0 else entry.msgid_plural)
+                    for plural_id in entry.msgstr_plural
+                    if not entry.msgstr_plural[plural_id]
+                ]
+            elif not entry.msgstr:
+                msgstrs = [(None, entry.msgid)]
+            else:
+                return None
+            return msgstrs, None
+        return None
+
+    def apply_bulk_action(self, action):
+        """Apply a bulk action to all the messages matching the current query
+        or msg_filter (not only those of the current page), save the catalog
+        once, and redirect to the first page of the view.
+        """
+        if action not in dict(self.bulk_actions):
+            raise Http404
+
+        with self.changing_catalog():
+            changed_entries = []
+            # The view changes as the entries are updated
+            for entry in list(self.get_entries()):
+                changes = self.bulk_action_changes(action, entry)
+                if changes is not None:
+                    entry = self.update_entry(entry, *changes)
+                    if entry is not None:
+                        changed_entries.append(entry)
+
+            try:
+                self.save_changes(changed_entries)
+            except Exception as e:
+                messages.error(self.request, e)
+            else:
+                messages.info(
+                    self.request,
+                    ngettext(
+                        "%(count)d message was changed.",
+                        "%(count)d messages were changed.",
+                        len(changed_entries),
+                    )
+                    % {"count": len(changed_entries)},
+                )
+
+        query_string_args = {
+            "msg_filter": self.msg_filter,
+            "query": self.query,
+            "ref_lang": self.ref_lang,
+        }
+        query_string_args = {k: v for k, v in query_string_args.items() if v}
+        return HttpResponseRedirect(
+            "{url}?{qs}".format(
+                url=reverse("rosetta-form", kwargs=self.kwargs),
+                qs=urlencode_safe(query_string_args),
+            )
+        )
+
     def get_context_data(self, **kwargs):
         context = super(TranslationFormView, self).get_context_data(**kwargs)
         entries = self.get_entries()
         paginator = Paginator(entries, rosetta_settings.MESSAGES_PER_PAGE)
 
-        # Handle REF_LANG setting; mark up our entries with the reg lang's
-        # corresponding translations
+        # Handle REF_LANG setting
         LANGUAGES = list(rosetta_settings.ROSETTA_LANGUAGES)
         if rosetta_settings.ENABLE_REFLANG:
-            if self.ref_lang_po_file:
-                for o in paginator.object_list:
-                    ref_entry = self.ref_lang_po_file.find(o.msgid)
-                    if ref_entry and ref_entry.msgstr:
-                        o.ref_txt = ref_entry.msgstr
-                    else:
-                        o.ref_txt = o.msgid
-            else:
-                for o in paginator.object_list:
-                    o.ref_txt = o.msgid
             # XXX: having "MSGID" at the end of the dropdown is really odd, no?
             # Why not instead do this?
             # LANGUAGES = [('', '----')] + list(settings.LANGUAGES)
@@ -475,7 +705,27 @@ class TranslationFormView(RosettaFileLevelMixin, TemplateView):
             else:
                 page_range = range(1, 1 + paginator.num_pages)
 
-        rosetta_messages = paginator.page(page).object_list
+        # The form fields are named after the keys of the entries. The entries
+        # are marked up below, so they are copied: the catalog is shared.
+        with timed("index"):
+            rosetta_messages = []
+            for message in paginator.page(page).object_list:
+                entry_key(message)
+                rosetta_messages.append(copy.copy(message))
+
+        # Mark up the entries of the page with the ref lang's corresponding
+        # translations
+        if rosetta_settings.ENABLE_REFLANG:
+            if self.ref_lang_po_file:
+                for o in rosetta_messages:
+                    ref_entry = self.ref_lang_po_file.find(o.msgid)
+                    if ref_entry and ref_entry.msgstr:
+                        o.ref_txt = ref_entry.msgstr
+                    else:
+                        o.ref_txt = o.msgid
+            else:
+                for o in rosetta_messages:
+                    o.ref_txt = o.msgid
 
         # Handle MAIN_LANGUAGE setting, if applicable; mark up each entry
         # in the pagination window with the "main language"'s string.
@@ -543,6 +793,10 @@ class TranslationFormView(RosettaFileLevelMixin, TemplateView):
                 "paginator": paginator,
                 "rosetta_i18n_pofile": self.po_file,
                 "ref_lang": self.ref_lang,
+                "bulk_actions": self.bulk_actions,
+                "compile_status": self.po_file_is_writable
+                and rosetta_settings.AUTO_COMPILE_IN_BACKGROUND
+                and compile_status(self.po_file_path),
             }
         )
 
@@ -608,6 +862,7 @@ class TranslationFormView(RosettaFileLevelMixin, TemplateView):
         """
         return self._request_request("query", "").strip() or None
 
+    @timed("entries")
     def get_entries(self):
         """Return a list of the entries (messages) that would be part of the
         current "view"; that is, all of the ones from this .po file matching the
@@ -615,35 +870,10 @@ class TranslationFormView(RosettaFileLevelMixin, TemplateView):
         """
         if self.query:
             # Scenario #1: terms matching a search query
-            rx = re.compile(re.escape(self.query), re.IGNORECASE)
-
-            def concat_entry(e):
-                return (
-                    str(e.msgstr)
-                    + str(e.msgid)
-                    + str(e.msgctxt)
-                    + str(e.comment)
-                    + "".join([o[0] for o in e.occurrences])
-                    + str(e.msgid_plural)
-                    + "".join(e.msgstr_plural.values())
-                )
-
-            entries = [
-                e_
-                for e_ in self.po_file
-                if not e_.obsolete and rx.search(concat_entry(e_))
-            ]
+            entries = search_entries(self.po_file, self.query)
         else:
             # Scenario #2: filtered list of messages
-            if self.msg_filter == "untranslated":
-                entries = self.po_file.untranslated_entries()
-            elif self.msg_filter == "translated":
-                entries = self.po_file.translated_entries()
-            elif self.msg_filter == "fuzzy":
-                entries = [e_ for e_ in self.po_file.fuzzy_entries() if not e_.obsolete]
-            else:
-                # ("all")
-                entries = [e_ for e_ in self.po_file if not e_.obsolete]
+            entries = filtered_entries(self.po_file, self.msg_filter)
         return entries
 
 
@@ -681,6 +911,96 @@ class TranslationFileDownload(RosettaFileLevelMixin, View):
             )
 
 
+class TranslationBulkUpdateView(RosettaFileLevelMixin, View):
+    """Update many entries of a catalog at once, with a single save (and
+    compilation) of the catalog.
+
+    The request body is a JSON object such as::
+
+        {"entries": [
+            {"key": "<entry key>", "msgstr": "...", "fuzzy": false},
+            {"key": "<entry key>", "msgstr_plural": {"0": "...", "1": "..."}},
+            ...
+        ]}
+
+    where "fuzzy" is optional, and so is "version": when given, the entry is
+    only updated if its version token still matches. The response lists the
+    outcome for each entry, in order: "changed", "unchanged", "not_found",
+    "conflict" or "invalid", along with its (new) version token.
+    """
+
+    http_method_names = ["post"]
+
+    def post(self, request, *args, **kwargs):
+        # Check that the catalog exists and can be translated by the user
+        # (raising a 404 otherwise) before anything else
+        self.po_file_path
+        try:
+            items = json.loads(request.body)["entries"]
+            if not isinstance(items, list):
+                raise ValueError
+        except (ValueError, TypeError, KeyError):
+            return JsonResponse(
+                {"error": 'Expected a JSON object with a list of "entries".'},
+                status=400,
+            )
+
+        with self.changing_catalog():
+            results = []
+            changed_entries = []
+            for item in items:
+                status, entry = self.update_item(item)
+                if status == "changed":
+                    changed_entries.append(entry)
+                results.append(
+                    {
+                        "key": item.get("key") if isinstance(item, dict) else None,
+                        "status": status,
+                        "version": entry_version(entry) if entry else None,
+                    }
+                )
+
+            try:
+                self.save_changes(changed_entries)
+            except Exception as e:
+                return JsonResponse({"error": str(e), "results": results}, status=500)
+        return JsonResponse({"changed": len(changed_entries), "results": results})
+
+    def update_item(self, item):
+        """Apply an item of the batch, return its status and entry."""
+        if not isinstance(item, dict) or not isinstance(item.get("key"), str):
+            return "invalid", None
+        entry = find_entry(self.po_file, item["key"])
+        if entry is None:
+            return "not_found", None
+        version = item.get("version")
+        if version and version != entry_version(entry):
+            return "conflict", entry
+
+        msgstrs = []
+        if entry.msgid_plural:
+            msgstr_plural = item.get("msgstr_plural", {})
+            if "msgstr" in item or not isinstance(msgstr_plural, dict):
+                return "invalid", entry
+            for plural_id, msgstr in msgstr_plural.items():
+                plural_id = int(plural_id) if str(plural_id).isdigit() else None
+                if plural_id not in entry.msgstr_plural or not isinstance(msgstr, str):
+                    return "invalid", entry
+                msgstrs.append((plural_id, msgstr))
+        elif "msgstr" in item:
+            if "msgstr_plural" in item or not isinstance(item["msgstr"], str):
+                return "invalid", entry
+            msgstrs.append((None, item["msgstr"]))
+
+        is_fuzzy = item.get("fuzzy")
+        if is_fuzzy is not None:
+            is_fuzzy = bool(is_fuzzy)
+        changed_entry = self.update_entry(entry, msgstrs, is_fuzzy)
+        if changed_entry is not None:
+            return "changed", changed_entry
+        return "unchanged", entry
+
+
 @user_passes_test(lambda user: can_translate(user), LoginURL())
 def translate_text(request):
     language_from = request.GET.get("from", None)
@@ -700,5 +1020,43 @@ def translate_text(request):
     return JsonResponse(data)
 
 
+@user_passes_test(lambda user: can_translate(user), LoginURL())
+@require_POST
+def translate_texts(request):
+    """Translate many texts at once, e.g. all the messages of a page. The
+    request body is a JSON object such as::
+
+        {"from": "en", "to": "fr", "texts": ["...", "..."]}
+
+    and the translations are returned in the same order.
+    """
+    try:
+        body = json.loads(request.body)
+        texts = body["texts"]
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+            raise ValueError
+    except (ValueError, TypeError, KeyError):
+        return JsonResponse(
+            {
+                "success": False,
+                "error": 'Expected a JSON object with a list of "texts".',
+            },
+            status=400,
+        )
+    language_from, language_to = body.get("from"), body.get("to")
+
+    if language_from == language_to:
+        data = {"success": True, "translations": texts}
+    else:
+        try:
+            translations = translate_many(texts, language_from, language_to)
+
+            data = {"success": True, "translations": translations}
+        except TranslationException as e:
+            data = {"success": False, "error": str(e)}
+
+    return JsonResponse(data)
+
+
 def urlencode_safe(query):
     return urlencode({k: force_bytes(v) for k, v in query.items()})
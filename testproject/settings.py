@@ -52,6 +52,7 @@ MIDDLEWARE = (
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
+    "rosetta.middleware.CatalogInvalidationMiddleware",
 )
 
 # Note: languages are overridden in the test runner